@@ -19,6 +19,8 @@ const recStatus=document.getElementById("recStatus");
 const downloadModal=document.getElementById("downloadModal");
 const activeMeetingLabel=document.getElementById("activeMeetingLabel");
 const recordTimer=document.getElementById("recordTimer");
+const liveToggle=document.getElementById("liveToggle");
+const liveTranscript=document.getElementById("liveTranscript");
 
 /* ================= STATE ================= */
 let selectedFile=null;
@@ -26,6 +28,10 @@ let meetingReady=false;
 let currentMeetingId=null;
 let timerInterval=null;
 let secondsElapsed=0;
+let liveEvents=null;
+let recordingSessionId=null;
+const newSessionId=()=>Math.random().toString(36).slice(2)+Date.now().toString(36);
+let chatSessionId=newSessionId();
 
 /* ================= TIMER ================= */
 function startTimer(){
@@ -74,7 +80,10 @@ function addMessage(text,role){
   return msg;
 }
 
-function clearChat(){chatMessages.innerHTML=""}
+function clearChat(){
+  chatMessages.innerHTML="";
+  chatSessionId=newSessionId();   /* new conversation memory */
+}
 
 /* ================= TYPING INDICATOR ================= */
 function showTypingIndicator(){
@@ -86,6 +95,55 @@ function showTypingIndicator(){
   return el;
 }
 
+/* ================= JOB POLLING ================= */
+const sleep=ms=>new Promise(r=>setTimeout(r,ms));
+
+async function waitForJob(jobId,onStage){
+  while(true){
+    const res=await fetch(`${API_BASE}/jobs/${jobId}`);
+    if(!res.ok) throw new Error("Job lookup failed");
+    const job=await res.json();
+    if(job.status==="done") return job;
+    if(job.status==="failed") throw new Error(job.error||"Processing failed");
+    if(onStage) onStage(job);
+    await sleep(2000);
+  }
+}
+
+function stageLabel(job){
+  const pct=Math.round((job.progress||0)*100);
+  return `${job.stage} (${pct}%)`;
+}
+
+/* ================= TOKEN STREAMING (SSE over fetch) ================= */
+async function streamTokens(path,body,onToken){
+  const res=await fetch(`${API_BASE}${path}`,{
+    method:"POST",
+    headers:{"Content-Type":"application/json"},
+    body:JSON.stringify(body)
+  });
+  if(!res.ok||!res.body) throw new Error("Stream failed");
+
+  const reader=res.body.getReader();
+  const decoder=new TextDecoder();
+  let buffer="";
+
+  while(true){
+    const {value,done}=await reader.read();
+    if(done) throw new Error("Stream ended early");
+    buffer+=decoder.decode(value,{stream:true});
+
+    let end;
+    while((end=buffer.indexOf("\n\n"))>=0){
+      const event=buffer.slice(0,end);
+      buffer=buffer.slice(end+2);
+      if(event.startsWith("event: done")) return;
+      if(event.startsWith("event: error")) throw new Error("Generation failed");
+      if(event.startsWith("data: ")) onToken(JSON.parse(event.slice(6)).token);
+    }
+  }
+}
+
 /* ================= HISTORY ================= */
 async function loadHistory(){
   try{
@@ -101,9 +159,16 @@ async function loadHistory(){
     }
 
     meetings.forEach(m=>{
+      const name=m.name||"Untitled Meeting";
       const div=document.createElement("div");
       div.className="history-item";
-      div.textContent=m.name;
+      div.textContent=m.status==="done"?name:`${name} (${m.status})`;
+      /* only finished meetings can be chatted with */
+      if(m.status!=="done"){
+        div.classList.add("disabled");
+        container.appendChild(div);
+        return;
+      }
       div.style.cursor="pointer";
       div.onclick=()=>{
         document.querySelectorAll(".history-item")
@@ -111,10 +176,10 @@ async function loadHistory(){
         div.classList.add("active");
         currentMeetingId=m.id;
         setMeetingReady(true);
-        setActiveMeeting(m.name);
+        setActiveMeeting(name);
         notesOutput.innerHTML='<div class="empty-state">Meeting loaded. Click Generate for highlights.</div>';
         clearChat();
-        addMessage(`Loaded meeting: ${m.name}`,"assistant");
+        addMessage(`Loaded meeting: ${name}`,"assistant");
       };
       container.appendChild(div);
     });
@@ -144,6 +209,26 @@ async function submitMeetingName(){
   loadHistory();
 }
 
+/* ================= LIVE TRANSCRIPT ================= */
+function openLiveTranscript(meetingId){
+  liveTranscript.innerHTML="";
+  liveTranscript.classList.remove("hidden");
+  liveEvents=new EventSource(`${API_BASE}/live/${meetingId}/events`);
+  liveEvents.onmessage=e=>{
+    const seg=JSON.parse(e.data);
+    const p=document.createElement("p");
+    p.className="highlight-line";
+    p.textContent=seg.text;
+    liveTranscript.appendChild(p);
+    liveTranscript.scrollTop=liveTranscript.scrollHeight;
+  };
+  liveEvents.addEventListener("done",closeLiveTranscript);
+}
+
+function closeLiveTranscript(){
+  if(liveEvents){liveEvents.close();liveEvents=null}
+}
+
 /* ================= RECORDING ================= */
 async function startRecording(){
   try{
@@ -151,7 +236,16 @@ async function startRecording(){
     recStatus.className="status recording";
     setMeetingReady(false);
     startTimer();
-    await fetch(`${API_BASE}/start-recording`,{method:"POST"});
+    const live=liveToggle.checked;
+    const res=await fetch(`${API_BASE}/start-recording`,{
+      method:"POST",
+      headers:{"Content-Type":"application/json"},
+      body:JSON.stringify({live:live})
+    });
+    if(!res.ok) throw new Error();
+    const data=await res.json();
+    recordingSessionId=data.session_id;
+    if(data.live) openLiveTranscript(data.meeting_id);
   }catch{
     recStatus.textContent="Failed";
     recStatus.className="status muted";
@@ -165,10 +259,21 @@ async function stopRecording(){
     recStatus.textContent="Processing...";
     recStatus.className="status processing";
 
-    const res=await fetch(`${API_BASE}/stop-recording`,{method:"POST"});
+    const res=await fetch(`${API_BASE}/stop-recording`,{
+      method:"POST",
+      headers:{"Content-Type":"application/json"},
+      body:JSON.stringify({session_id:recordingSessionId})
+    });
+    recordingSessionId=null;
     if(!res.ok) throw new Error();
 
     const data=await res.json();
+    if(data.job_id){
+      await waitForJob(data.job_id,job=>{
+        recStatus.textContent=`Processing: ${stageLabel(job)}`;
+      });
+    }
+
     currentMeetingId=data.meeting_id;
     askMeetingName();
 
@@ -182,6 +287,8 @@ async function stopRecording(){
   }catch{
     recStatus.textContent="Failed";
     recStatus.className="status muted";
+  }finally{
+    closeLiveTranscript();
   }
 }
 
@@ -232,6 +339,10 @@ uploadBtn.addEventListener("click",async()=>{
     if(!res.ok) throw new Error();
 
     const data=await res.json();
+    await waitForJob(data.job_id,job=>{
+      loaderText.textContent=`Processing meeting: ${stageLabel(job)}`;
+    });
+
     currentMeetingId=data.meeting_id;
     askMeetingName();
     setMeetingReady(true);
@@ -246,33 +357,30 @@ uploadBtn.addEventListener("click",async()=>{
   }
 });
 
-/* ================= NOTES (with line-by-line animation) ================= */
+/* ================= NOTES (streamed line by line) ================= */
+function renderNotes(text){
+  notesOutput.innerHTML="";
+  text.split("\n").forEach(line=>{
+    if(!line.trim()) return;
+    const p=document.createElement("p");
+    p.className="highlight-line";
+    p.textContent=line;
+    notesOutput.appendChild(p);
+  });
+}
+
 notesBtn.addEventListener("click",async()=>{
   if(!currentMeetingId) return;
   showLoader("Generating highlights...");
 
+  let text="";
   try{
-    const res=await fetch(`${API_BASE}/notes`,{
-      method:"POST",
-      headers:{"Content-Type":"application/json"},
-      body:JSON.stringify({meeting_id:currentMeetingId})
-    });
-
-    const data=await res.json();
-    const text=data.notes||"No notes.";
-
-    /* Animate highlights line by line */
-    notesOutput.innerHTML="";
-    const lines=text.split("\n");
-    lines.forEach((line,i)=>{
-      if(!line.trim()) return;
-      const p=document.createElement("p");
-      p.className="highlight-line";
-      p.textContent=line;
-      p.style.animationDelay=`${i*0.06}s`;
-      notesOutput.appendChild(p);
+    await streamTokens("/notes/stream",{meeting_id:currentMeetingId},token=>{
+      hideLoader();   /* first token → show the text as it arrives */
+      text+=token;
+      renderNotes(text);
     });
-
+    if(!text.trim()) notesOutput.textContent="No notes.";
   }catch{
     notesOutput.textContent="Failed to generate notes.";
   }finally{
@@ -306,7 +414,7 @@ function downloadFile(format){
   );
 }
 
-/* ================= CHAT (with typing indicator) ================= */
+/* ================= CHAT (streamed, typing indicator until first token) ================= */
 chatForm.addEventListener("submit",async e=>{
   e.preventDefault();
   const q=chatInput.value.trim();
@@ -316,19 +424,22 @@ chatForm.addEventListener("submit",async e=>{
   chatInput.value="";
 
   const typing=showTypingIndicator();
+  let msg=null;
 
   try{
-    const res=await fetch(`${API_BASE}/chat`,{
-      method:"POST",
-      headers:{"Content-Type":"application/json"},
-      body:JSON.stringify({question:q,meeting_id:currentMeetingId})
-    });
-    const data=await res.json();
+    await streamTokens("/chat/stream",
+      {question:q,meeting_id:currentMeetingId,session_id:chatSessionId},
+      token=>{
+        if(!msg){typing.remove();msg=addMessage("","assistant")}
+        msg.textContent+=token;
+        chatMessages.scrollTop=chatMessages.scrollHeight;
+      });
     typing.remove();
-    addMessage(data.answer||"No response","assistant");
+    if(!msg) addMessage("No response","assistant");
   }catch{
     typing.remove();
-    addMessage("Chat failed.","assistant");
+    if(msg) msg.textContent+=" [interrupted]";
+    else addMessage("Chat failed.","assistant");
   }
 });
 
@@ -0,0 +1,120 @@
+"""
+Embedding throughput benchmark on a synthetic 2-hour transcript.
+
+"before": model.encode(chunks) with defaults, .tolist(), one chroma add
+"after":  encode_chunks() (tuned batches, optional process pool),
+          float32 array straight into batched chroma adds
+
+    python -m benchmarks.bench_embed
+    EMBED_BATCH_SIZE=128 python -m benchmarks.bench_embed
+
+The process pool (EMBED_WORKERS > 1) only starts at EMBED_POOL_MIN_CHUNKS
+chunks (2000 by default, ~5 hours of speech; 2 hours is ~800 chunks).
+To measure it, lower the threshold or lengthen the transcript:
+
+    EMBED_WORKERS=4 EMBED_POOL_MIN_CHUNKS=0 python -m benchmarks.bench_embed
+    EMBED_WORKERS=4 python -m benchmarks.bench_embed --minutes 360
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+WORDS = (
+    "we need to ship the release by friday and marketing will prepare the "
+    "announcement while engineering fixes the remaining login bugs the budget "
+    "for next quarter was approved with a ten percent increase for hiring "
+    "anna owns the migration plan and raj will follow up with the vendor"
+).split()
+
+
+def fake_transcript(minutes, wpm=150, seed=0):
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) for _ in range(minutes * wpm))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--minutes", type=int, default=120)
+    parser.add_argument("--skip-store", action="store_true",
+                        help="only time encoding, not the chroma writes")
+    args = parser.parse_args()
+
+    import chromadb
+    from src.chunk_text import split_text
+    from src.embedding_models import (
+        EMBED_POOL_MIN_CHUNKS,
+        EMBED_WORKERS,
+        encode_chunks,
+        get_model,
+        stop_pools,
+    )
+
+    chunks = split_text(fake_transcript(args.minutes))
+    print(f"{args.minutes} min transcript → {len(chunks)} chunks")
+
+    pooled = EMBED_WORKERS > 1 and len(chunks) >= EMBED_POOL_MIN_CHUNKS
+    print(
+        f"\"after\" encodes on {EMBED_WORKERS} pool workers\n" if pooled else
+        f"\"after\" encodes in this process (pool needs EMBED_WORKERS > 1 "
+        f"and ≥ {EMBED_POOL_MIN_CHUNKS} chunks)\n"
+    )
+
+    model = get_model()
+    model.encode(chunks[:32])   # warm-up
+
+    def store(embeddings, batched):
+        path = tempfile.mkdtemp()
+        try:
+            client = chromadb.Client(settings=chromadb.Settings(
+                persist_directory=path, is_persistent=True
+            ))
+            collection = client.get_or_create_collection("bench")
+            ids = [str(i) for i in range(len(chunks))]
+
+            if batched:
+                from src.embed_store import add_batched
+                metas = [{"chunk": i} for i in range(len(chunks))]
+                add_batched(collection, client, ids, chunks, embeddings, metas)
+            else:
+                limit = client.get_max_batch_size()
+                for i in range(0, len(ids), limit):
+                    collection.add(
+                        ids=ids[i:i + limit],
+                        documents=chunks[i:i + limit],
+                        embeddings=embeddings[i:i + limit]
+                    )
+        finally:
+            shutil.rmtree(path, ignore_errors=True)
+
+    t0 = time.perf_counter()
+    before = model.encode(chunks).tolist()
+    enc_before = time.perf_counter() - t0
+    if not args.skip_store:
+        store(before, batched=False)
+    total_before = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    after = encode_chunks(chunks, use_cache=False)
+    enc_after = time.perf_counter() - t0
+    if not args.skip_store:
+        store(after, batched=True)
+    total_after = time.perf_counter() - t0
+
+    stop_pools()
+
+    n = len(chunks)
+    print(f"{'':8} {'encode chunks/s':>16} {'end-to-end chunks/s':>20}")
+    print(f"{'before':8} {n / enc_before:16.0f} {n / total_before:20.0f}")
+    print(f"{'after':8} {n / enc_after:16.0f} {n / total_after:20.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Load check for the LLM gateway against benchmarks/fake_llm_server.py.
+
+Fires --requests completions from --threads threads (as the FastAPI
+threadpool would), --duplicates of them with an identical prompt, plus
+a few streams, then prints the gateway metrics.
+
+    python -m benchmarks.fake_llm_server --fail-rate 0.2 &
+    LLM_BASE_URL=http://127.0.0.1:9000/v1 LLM_API_KEY=test LLM_RATE=20 python -m benchmarks.bench_llm
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--duplicates", type=int, default=10)
+    parser.add_argument("--streams", type=int, default=5)
+    parser.add_argument("--threads", type=int, default=20)
+    args = parser.parse_args()
+
+    from src.llm_gateway import close_gateway, get_gateway
+
+    gateway = get_gateway()
+
+    def ask(i):
+        prompt = "same question" if i < args.duplicates else f"question {i}"
+        return gateway.complete_sync([{"role": "user", "content": prompt}])["content"]
+
+    def stream(i):
+        return "".join(gateway.stream_sync([{"role": "user", "content": f"stream {i}"}]))
+
+    t0 = time.perf_counter()
+
+    with ThreadPoolExecutor(args.threads) as pool:
+        answers = list(pool.map(ask, range(args.requests)))
+        streamed = list(pool.map(stream, range(args.streams)))
+
+    elapsed = time.perf_counter() - t0
+
+    assert all(a.startswith("Echo:") for a in answers), "unexpected completion"
+    assert all(s.startswith("Echo:") for s in streamed), "unexpected stream"
+
+    print(f"{args.requests} completions + {args.streams} streams in {elapsed:.1f}s")
+    print(json.dumps(gateway.stats(), indent=2))
+
+    close_gateway()
+
+
+if __name__ == "__main__":
+    main()
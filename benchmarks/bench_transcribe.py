@@ -0,0 +1,100 @@
+"""
+Transcription backend benchmark.
+
+Compares real-time factor (transcribe time / audio length) and peak
+memory of each backend on one clip. Every backend runs in its own
+process so load time and memory are measured in isolation.
+
+    python -m benchmarks.bench_transcribe --clip my_meeting.mp4
+    python -m benchmarks.bench_transcribe --clip my_meeting.mp4 \
+        --backends whisper:small faster-whisper:small:int8
+
+No clip ships with the repo: use a few minutes of real speech
+(silence or synthetic tones make every backend look fast).
+"""
+
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+DEFAULT_BACKENDS = [
+    "whisper:small",
+    "faster-whisper:small:int8",
+]
+
+
+def _run(spec, audio, duration, results):
+    from src.transcribe_backends import load_backend
+
+    parts = spec.split(":")
+    name = parts[0]
+    model_name = parts[1] if len(parts) > 1 else None
+    compute_type = parts[2] if len(parts) > 2 else None
+
+    t0 = time.perf_counter()
+    backend = load_backend(name, model_name=model_name, compute_type=compute_type)
+    load_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    segments = backend.transcribe(audio)
+    run_s = time.perf_counter() - t0
+
+    # ru_maxrss is KiB on Linux
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    results.put({
+        "backend": spec,
+        "load_s": load_s,
+        "run_s": run_s,
+        "rtf": run_s / duration,
+        "peak_mb": peak_mb,
+        "segments": len(segments),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clip", required=True,
+                        help="audio/video file with real speech")
+    parser.add_argument("--backends", nargs="+", default=DEFAULT_BACKENDS,
+                        help="name:model[:compute_type]")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.clip):
+        sys.exit(f"Clip not found: {args.clip}")
+
+    from src.video_to_audio import decode_audio, SAMPLE_RATE
+
+    audio = decode_audio(args.clip)
+    duration = len(audio) / SAMPLE_RATE
+    print(f"Clip: {args.clip} ({duration:.1f}s)\n")
+
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+
+    print(f"{'backend':32} {'load s':>8} {'run s':>8} {'RTF':>6} {'peak MB':>9} {'segs':>5}")
+
+    for spec in args.backends:
+        proc = ctx.Process(target=_run, args=(spec, audio, duration, results))
+        proc.start()
+        proc.join()
+
+        if proc.exitcode != 0:
+            print(f"{spec:32} failed (exit {proc.exitcode})")
+            continue
+
+        r = results.get()
+        print(
+            f"{r['backend']:32} {r['load_s']:8.1f} {r['run_s']:8.1f} "
+            f"{r['rtf']:6.2f} {r['peak_mb']:9.0f} {r['segments']:5d}"
+        )
+
+
+if __name__ == "__main__":
+    main()
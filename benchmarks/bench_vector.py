@@ -0,0 +1,118 @@
+"""
+Vector store benchmark: Chroma vs NumpyIndex on random 384-dim vectors.
+
+Per size it reports the cold open (new client / first load, first
+query included) and the median latency of warm top-k queries.
+
+    python -m benchmarks.bench_vector
+    python -m benchmarks.bench_vector --sizes 100 1000 10000 --queries 200
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+DIM = 384
+
+
+class RandomEmbeddings:
+    """Stand-in for the sentence-transformer: queries are passed as vectors."""
+
+    def embed_query(self, text):
+        raise NotImplementedError
+
+    def embed_documents(self, texts):
+        raise NotImplementedError
+
+
+def fill_chroma(path, documents, vectors, metadatas):
+    from src.embed_store import _client, add_batched
+
+    client = _client(path)
+    collection = client.get_or_create_collection("bench")
+    ids = [str(i) for i in range(len(documents))]
+    add_batched(collection, client, ids, documents, vectors, metadatas)
+
+
+def open_chroma(path):
+    from chromadb.api.client import SharedSystemClient
+    from langchain_chroma import Chroma
+
+    # drop chromadb's per-path client cache → a real cold open
+    SharedSystemClient.clear_system_cache()
+
+    return Chroma(
+        persist_directory=path,
+        embedding_function=RandomEmbeddings(),
+        collection_name="bench"
+    )
+
+
+def open_numpy(path):
+    from src.numpy_index import NumpyIndex
+
+    return NumpyIndex(path, RandomEmbeddings())
+
+
+def timed(db_open, path, queries, k):
+    t0 = time.perf_counter()
+    db = db_open(path)
+    db.similarity_search_by_vector_with_relevance_scores(queries[0], k=k)
+    cold = time.perf_counter() - t0
+
+    latencies = []
+    for q in queries[1:]:
+        t0 = time.perf_counter()
+        db.similarity_search_by_vector_with_relevance_scores(q, k=k)
+        latencies.append(time.perf_counter() - t0)
+
+    return cold, statistics.median(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("-k", type=int, default=7)
+    args = parser.parse_args()
+
+    import numpy as np
+    from src.numpy_index import write_index
+
+    rng = np.random.default_rng(0)
+    queries = [q.tolist() for q in rng.standard_normal((args.queries + 1, DIM), np.float32)]
+
+    print(f"{'chunks':>7} {'store':>7} {'cold open ms':>13} {'query p50 ms':>13}")
+
+    for n in args.sizes:
+        vectors = rng.standard_normal((n, DIM), np.float32)
+        documents = [f"chunk {i}" for i in range(n)]
+        metadatas = [{"chunk": i} for i in range(n)]
+
+        root = tempfile.mkdtemp()
+        try:
+            chroma_dir = os.path.join(root, "chroma")
+            numpy_dir = os.path.join(root, "numpy")
+
+            fill_chroma(chroma_dir, documents, vectors, metadatas)
+            write_index(numpy_dir, documents, vectors, metadatas, "random")
+
+            for label, db_open, path in (
+                ("chroma", open_chroma, chroma_dir),
+                ("numpy", open_numpy, numpy_dir),
+            ):
+                cold, p50 = timed(db_open, path, queries, args.k)
+                print(f"{n:7d} {label:>7} {cold * 1000:13.1f} {p50 * 1000:13.2f}")
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Local stand-in for an OpenAI-compatible /chat/completions endpoint,
+for exercising the LLM gateway without a provider account.
+
+    python -m benchmarks.fake_llm_server --port 9000 --latency 0.5 --fail-rate 0.2
+    LLM_BASE_URL=http://127.0.0.1:9000/v1 LLM_API_KEY=test uvicorn main:app
+
+Answers echo the last message. --fail-rate returns that share of
+requests as 429 with Retry-After; /stats counts what it received.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+app = FastAPI(title="Fake LLM")
+
+settings = {"latency": 0.5, "fail_rate": 0.0, "token_delay": 0.02}
+counts = {"requests": 0, "rejected": 0, "streams": 0}
+
+
+def _answer(body):
+    last = body["messages"][-1]["content"] if body.get("messages") else ""
+    return f"Echo: {last[:200]}"
+
+
+@app.post("/v1/chat/completions")
+async def completions(request: Request):
+    body = await request.json()
+    counts["requests"] += 1
+
+    if random.random() < settings["fail_rate"]:
+        counts["rejected"] += 1
+        return JSONResponse(
+            {"error": {"message": "rate limited"}},
+            status_code=429,
+            headers={"retry-after": "0.1"}
+        )
+
+    await asyncio.sleep(settings["latency"])
+
+    answer = _answer(body)
+    usage = {"prompt_tokens": len(json.dumps(body["messages"])) // 4,
+             "completion_tokens": len(answer.split())}
+
+    if not body.get("stream"):
+        return {
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": answer}}],
+            "usage": usage,
+        }
+
+    counts["streams"] += 1
+
+    async def events():
+        for word in answer.split(" "):
+            chunk = {"choices": [{"index": 0, "delta": {"content": word + " "}}]}
+            yield f"data: {json.dumps(chunk)}\n\n"
+            await asyncio.sleep(settings["token_delay"])
+
+        yield f"data: {json.dumps({'choices': [], 'usage': usage})}\n\n"
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@app.get("/stats")
+async def stats():
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    settings["latency"] = args.latency
+    settings["fail_rate"] = args.fail_rate
+
+    uvicorn.run(app, host="127.0.0.1", port=args.port)
+
+
+if __name__ == "__main__":
+    main()
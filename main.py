@@ -3,23 +3,29 @@ Meeting Intelligence System — FastAPI backend
 """
 
 from pathlib import Path
+from typing import List, Optional, Union
 from uuid import uuid4
 import traceback
 import importlib
-import os
 import json
+import asyncio
 from datetime import datetime
 
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import FastAPI, UploadFile, File, Header, HTTPException, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
 from starlette.concurrency import run_in_threadpool
 
-from src.recorder import start_recording, stop_recording
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
-from docx import Document
+from src.recorder import RecordingManager
+from src.jobs import JobQueue
+from src.live import start_live, get_live, finish_live
+from src.embedding_models import stop_pools
+from src.embedding_cache import close_caches
+from src.llm_gateway import close_gateway, gateway_stats
+from src.search import search_meetings
+from src.chat import cache_stats as chat_cache_stats
+from src import exports, meeting_store
 
 
 # ===============================
@@ -38,6 +44,20 @@ services = load_services()
 process_meeting = getattr(services, "process_meeting")
 generate_notes = getattr(services, "generate_notes")
 ask_question = getattr(services, "ask_question")
+stream_notes = getattr(services, "stream_notes")
+stream_question = getattr(services, "stream_question")
+schedule_notes = getattr(services, "schedule_notes")
+stop_notes = getattr(services, "stop_notes")
+
+
+# ===============================
+# Background job queue
+# ===============================
+def mark_failed(meeting_id, error):
+    meeting_store.update(meeting_id, status="failed")
+
+
+jobs = JobQueue(process_meeting, on_failure=mark_failed)
 
 
 # ===============================
@@ -59,10 +79,34 @@ UPLOAD_DIR.mkdir(exist_ok=True)
 ALLOWED_EXTENSIONS = {".mp4", ".mp3", ".wav"}
 
 
+@app.on_event("startup")
+def reconcile_meetings():
+    """Meetings the last run left unfinished, with no job to finish them → failed."""
+
+    pending = {
+        job["meeting_id"] for job in jobs.list()
+        if job["status"] in ("queued", "running")
+    }
+
+    failed = meeting_store.fail_unfinished(keep=pending)
+    if failed:
+        print(f"⚠️ Marked {failed} unfinished meetings as failed")
+
+
+@app.on_event("shutdown")
+def shutdown_jobs():
+    recordings.stop_all()
+    jobs.shutdown()
+    stop_notes()
+    stop_pools()
+    close_caches()
+    close_gateway()
+
+
 # ===============================
 # Runtime state
 # ===============================
-stream = None
+recordings = RecordingManager()
 
 
 # ===============================
@@ -71,10 +115,32 @@ stream = None
 class ChatRequest(BaseModel):
     question: str
     meeting_id: str
+    # one conversation memory per session; left out → a new conversation
+    # (its id comes back as session_id / X-Session-Id)
+    session_id: Optional[str] = None
+
+
+class StartRecording(BaseModel):
+    device: Optional[Union[int, str]] = None   # None → default device, "fake" → test tone
+    live: bool = False
+
+
+class StopRecording(BaseModel):
+    session_id: Optional[str] = None   # may be left out while only one session runs
 
 
 class NotesRequest(BaseModel):
     meeting_id: str
+    regenerate: bool = False   # ignore stored notes, run the LLM again
+
+
+class SearchRequest(BaseModel):
+    query: str
+    k: int = 10
+    meeting_ids: Optional[List[str]] = None
+    name: Optional[str] = None          # substring of the meeting name
+    date_from: Optional[datetime] = None
+    date_to: Optional[datetime] = None
 
 
 class MeetingName(BaseModel):
@@ -82,6 +148,27 @@ class MeetingName(BaseModel):
     name: str
 
 
+# ===============================
+# Token streaming (Server-Sent Events)
+# ===============================
+async def sse_tokens(pieces):
+    """
+    LLM text pieces → SSE: one `data: {"token": ...}` per piece, then
+    `event: done`, or `event: error` if generation fails midway.
+    Async generator → no threadpool thread is held while tokens arrive.
+    """
+
+    try:
+        async for piece in pieces:
+            yield f"data: {json.dumps({'token': piece})}\n\n"
+
+        yield "event: done\ndata: {}\n\n"
+
+    except Exception:
+        traceback.print_exc()
+        yield "event: error\ndata: {}\n\n"
+
+
 # ===============================
 # Root
 # ===============================
@@ -94,48 +181,165 @@ async def root():
 # Start recording
 # ===============================
 @app.post("/start-recording")
-async def start_rec():
-    global stream
+async def start_rec(payload: Optional[StartRecording] = None):
+    """
+    Starts an independent capture session and returns its session_id.
+    live=true → transcribe + embed while recording;
+    partial transcript at /live/{meeting_id}/events
+    """
+    payload = payload or StartRecording()
+
+    meeting_id = uuid4().hex
+    live = None
+
     try:
-        stream = start_recording()
-        return {"message": "Recording started"}
+        audio_path = str(UPLOAD_DIR / f"{meeting_id}.wav")
+        meeting_store.create(meeting_id, "recording", media=audio_path)
+
+        live = start_live(meeting_id) if payload.live else None
+
+        # audio is spooled straight to this file while recording
+        session = recordings.start(
+            audio_path,
+            device=payload.device,
+            listener=live.feed if live else None,
+            meeting_id=meeting_id,
+            live=payload.live
+        )
+
+        return {
+            "message": "Recording started",
+            "session_id": session.session_id,
+            "meeting_id": meeting_id,
+            "live": payload.live
+        }
     except Exception:
         traceback.print_exc()
+
+        # device did not open → stop the live worker, it will never get audio
+        if live is not None:
+            try:
+                await run_in_threadpool(finish_live, meeting_id)
+            except Exception:
+                traceback.print_exc()
+
+        try:
+            meeting_store.update(meeting_id, status="failed")
+        except Exception:
+            traceback.print_exc()
+
         raise HTTPException(500, "Recording failed to start")
 
 
 # ===============================
-# Stop recording + process
+# Stop recording + queue processing
 # ===============================
-@app.post("/stop-recording")
-async def stop_rec():
-    global stream
+@app.post("/stop-recording", status_code=202)
+async def stop_rec(payload: Optional[StopRecording] = None):
 
-    if stream is None:
-        raise HTTPException(400, "Recording not started")
+    session_id = payload.session_id if payload else None
 
-    try:
-        meeting_id = uuid4().hex
+    session = recordings.get(session_id) if session_id else recordings.only()
+    if session is None:
+        raise HTTPException(400, "Recording not started")
 
-        audio_path = stop_recording(stream, "uploads/meeting.wav")
-        await run_in_threadpool(process_meeting, str(audio_path), meeting_id)
+    meeting_id = session.info["meeting_id"]
 
-        stream = None
+    try:
+        audio_path = recordings.stop(session.session_id)
+        seconds = session.to_dict()["seconds"]
+
+        # live mode → only the last window is left to process
+        if session.info["live"]:
+            try:
+                await run_in_threadpool(finish_live, meeting_id)
+            except Exception:
+                traceback.print_exc()
+
+                # live transcription failed → the spooled WAV has the whole
+                # meeting, run it through the normal pipeline instead
+                if audio_path is None:
+                    meeting_store.update(meeting_id, status="failed")
+                    raise HTTPException(500, "Recording processing failed")
+
+                meeting_store.update(meeting_id, status="queued")
+                job = jobs.submit(meeting_id, str(audio_path))
+
+                return {
+                    "message": "Live transcription failed, processing queued",
+                    "meeting_id": meeting_id,
+                    "job_id": job["job_id"]
+                }
+
+            meeting_store.update(meeting_id, status="done", duration=seconds)
+            schedule_notes(meeting_id)
+
+            return {
+                "message": "Recording stopped & processed",
+                "meeting_id": meeting_id,
+                "job_id": None
+            }
+
+        if audio_path is None:
+            meeting_store.update(meeting_id, status="failed")
+            raise HTTPException(400, "No audio captured")
+
+        meeting_store.update(meeting_id, status="queued")
+        job = jobs.submit(meeting_id, str(audio_path))
 
         return {
-            "message": "Recording stopped & processed",
-            "meeting_id": meeting_id
+            "message": "Recording stopped, processing queued",
+            "meeting_id": meeting_id,
+            "job_id": job["job_id"]
         }
 
+    except HTTPException:
+        raise
+
     except Exception:
         traceback.print_exc()
+        meeting_store.update(meeting_id, status="failed")
         raise HTTPException(500, "Recording processing failed")
 
 
+@app.get("/recordings")
+async def list_recordings():
+    return recordings.list()
+
+
 # ===============================
-# Upload + process
+# Live transcript (Server-Sent Events)
 # ===============================
-@app.post("/upload")
+@app.get("/live/{meeting_id}/events")
+async def live_events(meeting_id: str):
+
+    session = get_live(meeting_id)
+    if session is None:
+        raise HTTPException(404, "No live recording for this meeting")
+
+    async def events():
+        sent = 0
+        while True:
+            done = session.done
+            segments = session.segments[sent:]
+
+            for seg in segments:
+                yield f"data: {json.dumps(seg)}\n\n"
+            sent += len(segments)
+
+            if done:
+                yield "event: done\ndata: {}\n\n"
+                return
+
+            await asyncio.sleep(0.5)
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+# ===============================
+# Upload + queue processing
+# ===============================
+@app.post("/upload", status_code=202)
 async def upload(file: UploadFile = File(...)):
 
     ext = Path(file.filename).suffix.lower()
@@ -150,18 +354,38 @@ async def upload(file: UploadFile = File(...)):
             while chunk := await file.read(1024 * 1024):
                 f.write(chunk)
 
-        await run_in_threadpool(process_meeting, str(file_path), meeting_id)
+        meeting_store.create(meeting_id, "queued", media=str(file_path))
+        job = jobs.submit(meeting_id, str(file_path))
 
     except Exception:
         traceback.print_exc()
-        raise HTTPException(500, "Pipeline crashed")
+        raise HTTPException(500, "Upload failed")
 
     return {
-        "message": "meeting processed successfully",
-        "meeting_id": meeting_id
+        "message": "meeting queued for processing",
+        "meeting_id": meeting_id,
+        "job_id": job["job_id"]
     }
 
 
+# ===============================
+# Job status
+# ===============================
+@app.get("/jobs")
+async def list_jobs():
+    return jobs.list()
+
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(404, "Job not found")
+
+    return job
+
+
 # ===============================
 # Generate highlights (SELECTED MEETING)
 # ===============================
@@ -169,10 +393,7 @@ async def upload(file: UploadFile = File(...)):
 async def notes(payload: NotesRequest):
 
     try:
-        result = await run_in_threadpool(
-            generate_notes,
-            payload.meeting_id
-        )
+        result = await generate_notes(payload.meeting_id, payload.regenerate)
         return {"notes": result}
 
     except Exception:
@@ -180,123 +401,126 @@ async def notes(payload: NotesRequest):
         raise HTTPException(500, "Notes generation failed")
 
 
+@app.post("/notes/stream")
+async def notes_stream(payload: NotesRequest):
+    """Highlights token by token (SSE); stored notes arrive as one piece."""
+
+    return StreamingResponse(
+        sse_tokens(stream_notes(payload.meeting_id, payload.regenerate)),
+        media_type="text/event-stream"
+    )
+
+
 # ===============================
 # Chat (SELECTED MEETING)
 # ===============================
 @app.post("/chat")
 async def chat(payload: ChatRequest):
 
+    session_id = payload.session_id or uuid4().hex
+
     try:
-        answer = await run_in_threadpool(
-            ask_question,
+        answer = await ask_question(
             payload.question,
-            payload.meeting_id
+            payload.meeting_id,
+            session_id
         )
-        return {"answer": answer}
+        return {"answer": answer, "session_id": session_id}
 
     except Exception:
         traceback.print_exc()
         raise HTTPException(500, "Chat failed")
 
 
-# ==========================================================
-# Download Highlights
-# ==========================================================
-@app.get("/download-notes")
-def download_notes(meeting_id: str, format: str = "pdf"):
-
-    # ---------- load meeting name ----------
-    meeting_name = meeting_id
-    mapping_file = "data/meetings.json"
-
-    if os.path.exists(mapping_file):
-        with open(mapping_file) as f:
-            db = json.load(f)
-            meeting_name = db.get(meeting_id, meeting_id)
-
-    meeting_name = "".join(
-        c for c in meeting_name if c.isalnum() or c in (" ", "-", "_")
-    ).strip()
-
-    download_time = datetime.now().strftime("%d %b %Y, %I:%M %p")
-
-    txt_path = f"Notes/highlights_{meeting_id}.txt"
+@app.post("/chat/stream")
+async def chat_stream(payload: ChatRequest):
+    """Answer token by token (SSE); same session memory as /chat."""
 
-    if not os.path.exists(txt_path):
-        return {"error": "Highlights not generated yet."}
+    session_id = payload.session_id or uuid4().hex
 
-    with open(txt_path, "r", encoding="utf-8") as f:
-        text = f.read()
+    return StreamingResponse(
+        sse_tokens(stream_question(
+            payload.question,
+            payload.meeting_id,
+            session_id
+        )),
+        media_type="text/event-stream",
+        headers={"X-Session-Id": session_id}
+    )
 
 
-    # ================= PDF =================
-    if format == "pdf":
+@app.get("/chat/cache")
+async def chat_cache():
+    return chat_cache_stats()
 
-        pdf_path = f"Notes/{meeting_name}_{meeting_id}.pdf"
 
-        doc = SimpleDocTemplate(pdf_path)
-        styles = getSampleStyleSheet()
-        elements = []
+@app.get("/llm/metrics")
+async def llm_metrics():
+    """Calls, retries, coalesced requests, tokens and latency of the LLM gateway."""
+    return gateway_stats()
 
-        elements.append(Paragraph("Meeting Highlights", styles["Heading1"]))
-        elements.append(Spacer(1, 20))
-        elements.append(Paragraph(f"Meeting: {meeting_name}", styles["Normal"]))
-        elements.append(Paragraph(f"Downloaded: {download_time}", styles["Normal"]))
-        elements.append(Spacer(1, 20))
 
-        for line in text.split("\n"):
-            elements.append(Paragraph(line, styles["BodyText"]))
-            elements.append(Spacer(1, 8))
+# ===============================
+# Search across ALL meetings
+# ===============================
+@app.post("/search")
+async def search(payload: SearchRequest):
 
-        doc.build(elements)
+    if not payload.query.strip():
+        raise HTTPException(400, "Empty query")
 
-        return FileResponse(
-            pdf_path,
-            media_type="application/pdf",
-            filename=f"{meeting_name}.pdf"
+    try:
+        results = await run_in_threadpool(
+            search_meetings,
+            payload.query.strip(),
+            k=max(1, min(payload.k, 100)),
+            meeting_ids=payload.meeting_ids,
+            name=payload.name,
+            date_from=payload.date_from.timestamp() if payload.date_from else None,
+            date_to=payload.date_to.timestamp() if payload.date_to else None
         )
+        return {"results": results}
 
-
-    # ================= TXT =================
-    elif format == "txt":
-
-        header = f"Meeting: {meeting_name}\nDownloaded: {download_time}\n\n"
-        temp_path = f"Notes/{meeting_name}_{meeting_id}.txt"
-
-        with open(temp_path, "w", encoding="utf-8") as f:
-            f.write(header + text)
-
-        return FileResponse(
-            temp_path,
-            media_type="text/plain",
-            filename=f"{meeting_name}.txt"
-        )
+    except Exception:
+        traceback.print_exc()
+        raise HTTPException(500, "Search failed")
 
 
-    # ================= DOCX =================
-    elif format == "docx":
+# ==========================================================
+# Download Highlights
+# ==========================================================
+@app.get("/download-notes")
+async def download_notes(
+    meeting_id: str,
+    format: str = "pdf",
+    if_none_match: Optional[str] = Header(None)
+):
+    """
+    Rendered files are cached (src/exports.py) and carry an ETag;
+    a matching If-None-Match gets 304 without touching the renderer.
+    """
 
-        docx_path = f"Notes/{meeting_name}_{meeting_id}.docx"
+    try:
+        export = await run_in_threadpool(exports.prepare, meeting_id, format)
+    except ValueError:
+        return {"error": "Invalid format"}
 
-        document = Document()
-        document.add_heading("Meeting Highlights", 0)
-        document.add_paragraph(f"Meeting: {meeting_name}")
-        document.add_paragraph(f"Downloaded: {download_time}")
-        document.add_paragraph("")
+    if export is None:
+        return {"error": "Highlights not generated yet."}
 
-        for line in text.split("\n"):
-            document.add_paragraph(line)
+    headers = {"ETag": export.etag, "Cache-Control": "no-cache"}
 
-        document.save(docx_path)
+    if if_none_match and export.etag in [t.strip() for t in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
 
-        return FileResponse(
-            docx_path,
-            media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-            filename=f"{meeting_name}.docx"
-        )
+    path = await run_in_threadpool(exports.render, export)
 
-    else:
-        return {"error": "Invalid format"}
+    return FileResponse(
+        path,
+        media_type=export.media_type,
+        filename=export.filename,
+        headers=headers
+    )
 
 
 # ==========================================================
@@ -305,19 +529,7 @@ def download_notes(meeting_id: str, format: str = "pdf"):
 @app.post("/set-meeting-name")
 def set_meeting_name(data: MeetingName):
 
-    os.makedirs("data", exist_ok=True)
-    file = "data/meetings.json"
-
-    if os.path.exists(file):
-        with open(file) as f:
-            db = json.load(f)
-    else:
-        db = {}
-
-    db[data.meeting_id] = data.name
-
-    with open(file, "w") as f:
-        json.dump(db, f, indent=2)
+    meeting_store.set_name(data.meeting_id, data.name)
 
     return {"status": "saved"}
 
@@ -326,17 +538,29 @@ def set_meeting_name(data: MeetingName):
 # Meeting history list
 # ==========================================================
 @app.get("/meetings")
-def list_meetings():
-
-    file = "data/meetings.json"
+def list_meetings(
+    response: Response,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    sort: str = "-created_at",
+    q: Optional[str] = None
+):
+    """
+    One page of meetings, newest first by default.
+    sort: created_at | name | duration | status, "-" prefix → descending
+    q:    name contains (case-insensitive)
+    Total count → X-Total-Count header.
+    """
 
-    if not os.path.exists(file):
-        return []
+    try:
+        meetings, total = meeting_store.list_meetings(offset, limit, sort, q)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
 
-    with open(file) as f:
-        db = json.load(f)
+    response.headers["X-Total-Count"] = str(total)
 
-    meetings = [{"id": k, "name": v} for k, v in db.items()]
-    meetings.reverse()
+    # artifact kinds only; their paths are server internals
+    for m in meetings:
+        m["artifacts"] = sorted(m["artifacts"])
 
     return meetings
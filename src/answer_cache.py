@@ -0,0 +1,100 @@
+# src/answer_cache.py
+
+import os
+import re
+import threading
+
+import numpy as np
+
+from src.embedding_models import get_embeddings
+from src.ttl_cache import TTLCache
+
+# ANSWER_CACHE=0 turns it off
+ENABLED = os.getenv("ANSWER_CACHE", "1") != "0"
+# cosine similarity a new question needs to reuse a past answer
+THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.92"))
+# answers kept across all meetings / idle seconds before one is dropped
+MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_SIZE", "1024"))
+TTL = float(os.getenv("ANSWER_CACHE_TTL", "3600"))
+
+# (meeting_id, normalised question) → (unit vector, answer)
+_answers = TTLCache(maxsize=MAX_ENTRIES, ttl=TTL)
+
+_stats_lock = threading.Lock()
+_stats = {"exact_hits": 0, "semantic_hits": 0, "misses": 0}
+
+
+def _normalise(question: str) -> str:
+    return re.sub(r"\s+", " ", question.strip().lower()).rstrip("?!. ")
+
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def _embed(question: str):
+    vector = np.asarray(get_embeddings().embed_query(question), np.float32)
+    return vector / max(float(np.linalg.norm(vector)), 1e-12)
+
+
+def lookup(meeting_id: str, question: str):
+    """
+    A cached answer for this meeting whose question is the same, or
+    close enough in embedding space (≥ THRESHOLD). None on a miss.
+    """
+
+    if not ENABLED:
+        return None
+
+    key = (meeting_id, _normalise(question))
+
+    entry = _answers.get(key)
+    if entry is not None:
+        _count("exact_hits")
+        return entry[1]
+
+    candidates = [
+        (k, v) for k, v in _answers.items() if k[0] == meeting_id
+    ]
+
+    if candidates:
+        vectors = np.stack([v[0] for _, v in candidates])
+        scores = vectors @ _embed(question)
+        best = int(np.argmax(scores))
+
+        if scores[best] >= THRESHOLD:
+            entry = _answers.get(candidates[best][0])   # refreshes LRU / ttl
+            if entry is not None:
+                _count("semantic_hits")
+                return entry[1]
+
+    _count("misses")
+    return None
+
+
+def store(meeting_id: str, question: str, answer: str):
+    if not ENABLED:
+        return
+
+    _answers.set(
+        (meeting_id, _normalise(question)),
+        (_embed(question), answer)
+    )
+
+
+def invalidate(meeting_id: str):
+    """Drop a meeting's answers (re-ingest, live transcription appended)."""
+
+    _answers.pop_where(lambda key: key[0] == meeting_id)
+
+
+def stats():
+    with _stats_lock:
+        counts = dict(_stats)
+
+    return {
+        **_answers.stats(),
+        **counts,
+        "threshold": THRESHOLD,
+    }
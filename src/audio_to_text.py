@@ -1,28 +1,165 @@
-import whisper
 import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from src.vad import split_on_silence
+from src.transcribe_backends import load_backend
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
-# load model only once (fast)
-model = whisper.load_model("small")
+SAMPLE_RATE = 16000
 
+# TRANSCRIBE_WORKERS > 1 → split on silence and transcribe windows in parallel
+TRANSCRIBE_WORKERS = int(os.getenv("TRANSCRIBE_WORKERS", "1"))
+TRANSCRIBE_WINDOW_SECONDS = float(os.getenv("TRANSCRIBE_WINDOW_SECONDS", "120"))
 
-def audio_to_text(audio_path):
+_backend = None
+_backend_threads = None
+_backend_lock = threading.Lock()
 
-    output_folder = os.path.join(BASE_DIR, "data", "intermediate")
-    os.makedirs(output_folder, exist_ok=True)
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
 
-    result = model.transcribe(audio_path, task="translate")
 
+def get_backend():
+    """
+    Load the configured transcription backend once per process
+    (see src/transcribe_backends.py for TRANSCRIBE_BACKEND etc.).
+    """
 
-    output_file = os.path.join(output_folder, "transcript.txt")
+    global _backend
+
+    with _backend_lock:
+        if _backend is None:
+            _backend = load_backend(threads=_backend_threads)
+
+    return _backend
+
+
+def transcribe(audio, task="translate"):
+    """
+    audio → list of Whisper segments.
+
+    audio can be a file path or a mono 16 kHz float32 array.
+    Each segment is {"start": sec, "end": sec, "text": str}.
+    """
+
+    return get_backend().transcribe(audio, task=task)
+
+
+def transcribe_windows(windows, task="translate"):
+    """
+    Transcribe (offset_seconds, audio) windows one after another,
+    e.g. from video_to_audio.iter_audio_windows, and shift every
+    segment back onto the meeting's timeline.
+    """
+
+    segments = []
+
+    for offset, window in windows:
+        segments.extend(_transcribe_window((offset, window, task)))
+
+    return segments
+
+
+# ===============================
+# Parallel (CPU) transcription
+# ===============================
+def _init_worker(threads):
+    global _backend_threads
+
+    _backend_threads = threads
+    get_backend()
+
+
+def _transcribe_window(job):
+    offset, window, task = job
+
+    segments = transcribe(window, task=task)
+    for seg in segments:
+        seg["start"] += offset
+        seg["end"] += offset
+
+    return segments
+
+
+def _get_pool(workers):
+    """
+    Worker processes are kept between meetings so each one loads
+    the model only once.
+    """
 
-    segments = result["segments"]
+    global _pool, _pool_workers
+
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+
+            threads = max(1, (os.cpu_count() or 1) // workers)
+
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(threads,)
+            )
+            _pool_workers = workers
+
+    return _pool
+
+
+def transcribe_parallel(audio, task="translate", workers=None, window_seconds=None):
+    """
+    Split a float32 buffer at pauses (src/vad.py) into windows of about
+    window_seconds, transcribe them across a process pool, and stitch
+    the segments back in order with meeting-relative timestamps.
+
+    With one worker (the default) the whole buffer goes to Whisper in
+    one call, same as before.
+    """
+
+    workers = TRANSCRIBE_WORKERS if workers is None else workers
+    window_seconds = TRANSCRIBE_WINDOW_SECONDS if window_seconds is None else window_seconds
+
+    if workers <= 1 or len(audio) <= window_seconds * SAMPLE_RATE:
+        return transcribe(audio, task=task)
+
+    jobs = [
+        (start / SAMPLE_RATE, audio[start:end], task)
+        for start, end in split_on_silence(audio, SAMPLE_RATE, window_seconds)
+    ]
+
+    print(f"🧩 Transcribing {len(jobs)} windows on {workers} workers")
+
+    segments = []
+    for window_segments in _get_pool(workers).map(_transcribe_window, jobs):
+        segments.extend(window_segments)
+
+    return segments
+
+
+def write_transcript(segments, output_file):
 
     with open(output_file, "w", encoding="utf-8") as f:
         for seg in segments:
-            f.write(seg["text"].strip() + "\n")
+            f.write(seg["text"] + "\n")
 
     print(f"Transcript saved at {output_file}")
 
-    return output_file   # 🔥 VERY IMPORTANT
+    return output_file
+
+
+def audio_to_text(audio_path, output_folder=None):
+
+    if output_folder is None:
+        output_folder = os.path.join(BASE_DIR, "data", "intermediate")
+    os.makedirs(output_folder, exist_ok=True)
+
+    segments = transcribe(audio_path)
+
+    output_file = os.path.join(output_folder, "transcript.txt")
+
+    return write_transcript(segments, output_file)   # 🔥 VERY IMPORTANT
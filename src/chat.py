@@ -2,7 +2,8 @@
 # LOAD ENV
 # ===============================
 from dotenv import load_dotenv
-from pathlib import Path
+import asyncio
+import os
 
 load_dotenv()
 
@@ -10,35 +11,42 @@ load_dotenv()
 # ===============================
 # IMPORTS
 # ===============================
-from langchain_groq import ChatGroq
-from langchain_chroma import Chroma
-from langchain_community.embeddings import SentenceTransformerEmbeddings
-
 from langchain_classic.chains import ConversationalRetrievalChain
 from langchain_classic.memory import ConversationBufferWindowMemory
 
+from langchain_classic.chains.conversational_retrieval.prompts import CONDENSE_QUESTION_PROMPT
+
+from langchain_core.messages import get_buffer_string
 from langchain_core.prompts import PromptTemplate
 
+from src.llm_gateway import get_llm
+from src.ttl_cache import TTLCache
+from src import answer_cache, vectorstore
+
 
 # ===============================
-# PATH SETUP
+# CACHES
 # ===============================
-BASE_DIR = Path(__file__).resolve().parent.parent
-VECTORDB_DIR = BASE_DIR / "data" / "vectordb"
+# chains (with their conversation memory), one per meeting + session
+CHAIN_CACHE_SIZE = int(os.getenv("CHAT_CHAIN_CACHE_SIZE", "256"))
+# idle seconds before an entry is dropped
+CHAT_CACHE_TTL = float(os.getenv("CHAT_CACHE_TTL", "1800"))
 
+_chains = TTLCache(maxsize=CHAIN_CACHE_SIZE, ttl=CHAT_CACHE_TTL)
 
-# ===============================
-# EMBEDDING (load once → faster)
-# ===============================
-embedding = SentenceTransformerEmbeddings(
-    model_name="all-MiniLM-L6-v2"
-)
+# chunks sent to the LLM per question; hybrid retrieval ranks exact
+# names/numbers/dates high, so fewer chunks are needed than with vectors only
+RETRIEVER_K = int(os.getenv("RETRIEVER_K", "4"))
+
+# vector-store handles + the shared embedding model live in
+# src/vectorstore.py and src/embedding_models.py
 
 
 # ===============================
 # LLM (load once)
 # ===============================
-llm = ChatGroq(
+# rate limits, retries and connection reuse → src/llm_gateway.py
+llm = get_llm(
     model_name="openai/gpt-oss-120b",
     temperature=0
 )
@@ -85,22 +93,10 @@ def load_chain(meeting_id: str):
     specific to ONE meeting.
     """
 
-    db_path = VECTORDB_DIR / meeting_id
-
-    if not db_path.exists():
-        raise ValueError(f"Meeting not found: {meeting_id}")
-
-    db = Chroma(
-        persist_directory=str(db_path),
-        embedding_function=embedding,
-        collection_name="meeting_chunks"
-    )
-
     # ===== Improved Retriever =====
-    retriever = db.as_retriever(
-        search_kwargs={
-            "k": 7   # slightly more context improves accuracy
-        }
+    retriever = vectorstore.get_retriever(
+        meeting_id,
+        k=RETRIEVER_K
     )
 
     # ===== Meeting-specific memory =====
@@ -120,31 +116,145 @@ def load_chain(meeting_id: str):
     return chain
 
 
+def get_chain(meeting_id: str, session_id: str):
+    """
+    Cached chain for one conversation → memory survives between turns.
+    The lock keeps two requests of the same session from interleaving.
+    Blocking on a miss (opens the meeting's store) → call from a thread.
+    """
+
+    return _chains.get_or_create(
+        (meeting_id, session_id),
+        lambda: (load_chain(meeting_id), asyncio.Lock())
+    )
+
+
+def invalidate_meeting(meeting_id: str):
+    """Forget cached handles/chains of a meeting (e.g. after re-ingest)."""
+
+    vectorstore.invalidate(meeting_id)
+    answer_cache.invalidate(meeting_id)
+    _chains.pop_where(lambda key: key[0] == meeting_id)
+
+
+def cache_stats():
+    return {
+        "stores": vectorstore.cache_stats(),
+        "lexical": vectorstore.lexical_stats(),
+        "chains": _chains.stats(),
+        "answers": answer_cache.stats(),
+    }
+
+
+# ===============================
+# HELPERS → same steps as ConversationalRetrievalChain
+# ===============================
+# LLM calls are awaited (ainvoke / astream → src/llm_gateway.py), so no
+# thread waits on the provider; embedding and retrieval are local CPU /
+# disk work and run in worker threads.
+async def _standalone_question(qa_chain, question: str) -> str:
+    """Rewrite a follow-up into a standalone question using the history."""
+
+    history = qa_chain.memory.load_memory_variables({})["chat_history"]
+
+    if not history:
+        return question
+
+    result = await (CONDENSE_QUESTION_PROMPT | llm).ainvoke({
+        "question": question,
+        "chat_history": get_buffer_string(history)
+    })
+
+    return result.content.strip() or question
+
+
+async def _inputs(qa_chain, standalone: str) -> dict:
+    docs = await asyncio.to_thread(qa_chain.retriever.invoke, standalone)
+
+    return {
+        "context": "\n\n".join(d.page_content for d in docs),
+        "question": standalone,
+    }
+
+
 # ===============================
 # MAIN FUNCTION (API safe)
 # ===============================
-def ask_question(query: str, meeting_id: str) -> str:
+async def ask_question(query: str, meeting_id: str, session_id: str) -> str:
     """
     Called by FastAPI.
 
     Each meeting:
       → separate vectordb
-      → separate memory
+      → separate memory per chat session
+      → answers shared across sessions via the semantic answer
+        cache (src/answer_cache.py), keyed by the standalone question
     """
 
     if not query.strip():
         return "Please ask a valid question."
 
-    qa_chain = load_chain(meeting_id)
+    question = query.strip()
+    qa_chain, lock = await asyncio.to_thread(get_chain, meeting_id, session_id)
 
-    result = qa_chain.invoke({
-        "question": query.strip()
-    })
+    async with lock:
+        standalone = await _standalone_question(qa_chain, question)
 
-    answer = result["answer"].strip()
+        answer = await asyncio.to_thread(answer_cache.lookup, meeting_id, standalone)
 
-    # ===== Extra Safety Filter =====
-    if not answer:
-        return "Not found in the meeting transcript"
+        if answer is None:
+            result = await (prompt | llm).ainvoke(await _inputs(qa_chain, standalone))
+            answer = result.content.strip()
+
+            # ===== Extra Safety Filter =====
+            if not answer:
+                answer = "Not found in the meeting transcript"
+
+            await asyncio.to_thread(answer_cache.store, meeting_id, standalone, answer)
+
+        qa_chain.memory.save_context({"question": question}, {"answer": answer})
 
     return answer
+
+
+# ===============================
+# STREAMING (token by token)
+# ===============================
+async def stream_answer(query: str, meeting_id: str, session_id: str):
+    """
+    Same steps as ask_question, but the final LLM call is streamed.
+    A cached answer is sent as one piece.
+
+    Yields text pieces as the LLM produces them.
+    """
+
+    if not query.strip():
+        yield "Please ask a valid question."
+        return
+
+    question = query.strip()
+    qa_chain, lock = await asyncio.to_thread(get_chain, meeting_id, session_id)
+
+    async with lock:
+        standalone = await _standalone_question(qa_chain, question)
+
+        answer = await asyncio.to_thread(answer_cache.lookup, meeting_id, standalone)
+
+        if answer is not None:
+            yield answer
+        else:
+            parts = []
+            async for piece in (prompt | llm).astream(await _inputs(qa_chain, standalone)):
+                if piece.content:
+                    parts.append(piece.content)
+                    yield piece.content
+
+            answer = "".join(parts).strip()
+
+            if not answer:
+                answer = "Not found in the meeting transcript"
+                yield answer
+
+            await asyncio.to_thread(answer_cache.store, meeting_id, standalone, answer)
+
+        qa_chain.memory.save_context({"question": question}, {"answer": answer})
@@ -1,35 +1,102 @@
 import os
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import List, Optional
+
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
+CHUNK_SIZE = 150
+CHUNK_OVERLAP = 30
 
-def chunk_text(transcript_path):
 
-    output_folder = os.path.join(BASE_DIR, "data", "intermediate")
-    os.makedirs(output_folder, exist_ok=True)
+@dataclass
+class Chunk:
+    text: str
+    start: Optional[float] = None   # seconds into the meeting
+    end: Optional[float] = None
 
-    # read transcript
-    with open(transcript_path, "r", encoding="utf-8") as f:
-        text = f.read()
 
-    # chunking
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=150,
-        chunk_overlap=30
+def _splitter():
+    return RecursiveCharacterTextSplitter(
+        chunk_size=CHUNK_SIZE,
+        chunk_overlap=CHUNK_OVERLAP,
+        add_start_index=True
     )
 
-    chunks = splitter.split_text(text)
 
-    # save chunks
-    output_path = os.path.join(output_folder, "chunks.txt")
+def split_text(text: str) -> List[str]:
+    return _splitter().split_text(text)
+
+
+def split_segments(segments) -> List[Chunk]:
+    """
+    Whisper segments → chunks, keeping the time range each chunk covers.
+    Same text layout as transcript.txt (one segment per line).
+    """
+
+    offsets = []
+    lines = []
+    pos = 0
+
+    for seg in segments:
+        offsets.append(pos)
+        lines.append(seg["text"])
+        pos += len(seg["text"]) + 1
+
+    text = "\n".join(lines)
+
+    chunks = []
+
+    for doc in _splitter().create_documents([text]):
+        first = doc.metadata.get("start_index", -1)
+
+        if first < 0 or not segments:
+            chunks.append(Chunk(doc.page_content))
+            continue
+
+        last = first + len(doc.page_content) - 1
+
+        i = max(bisect_right(offsets, first) - 1, 0)
+        j = max(bisect_right(offsets, last) - 1, i)
+
+        chunks.append(Chunk(
+            doc.page_content,
+            start=segments[i]["start"],
+            end=segments[j]["end"]
+        ))
+
+    return chunks
+
+
+def write_chunks(chunks, output_path):
 
     with open(output_path, "w", encoding="utf-8") as f:
         for i, chunk in enumerate(chunks, 1):
             f.write(f"\n----- CHUNK {i} -----\n")
-            f.write(chunk + "\n")
+            f.write(getattr(chunk, "text", chunk) + "\n")
 
     print(f"Chunks saved at: {output_path}")
     print(f"Total chunks created: {len(chunks)}")
 
-    return output_path   #  VERY IMPORTANT
+    return output_path
+
+
+def chunk_text(transcript_path, output_folder=None):
+
+    if output_folder is None:
+        output_folder = os.path.join(BASE_DIR, "data", "intermediate")
+    os.makedirs(output_folder, exist_ok=True)
+
+    # read transcript
+    with open(transcript_path, "r", encoding="utf-8") as f:
+        text = f.read()
+
+    # chunking
+    chunks = split_text(text)
+
+    # save chunks
+    output_path = os.path.join(output_folder, "chunks.txt")
+
+    return write_chunks(chunks, output_path)   #  VERY IMPORTANT
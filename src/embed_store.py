@@ -1,56 +1,320 @@
 import os
+import re
+import time
 import chromadb
-from sentence_transformers import SentenceTransformer
 
+from src import lexical_index, numpy_index
+from src.chunk_text import Chunk
+from src.embedding_models import (
+    EMBEDDING_MODEL,
+    LEGACY_EMBEDDING_MODEL,
+    encode_chunks,
+)
 
-model = SentenceTransformer("paraphrase-multilingual-MiniLM-L12-v2")
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
+VECTORDB_DIR = os.path.join(BASE_DIR, "data", "vectordb")
+COLLECTION_NAME = "meeting_chunks"
 
-def embed_store(chunks_file: str, meeting_id: str):
-    """
-    Store embeddings using SAME meeting_id from backend.
-    DO NOT generate new id here.
-    """
+# VECTOR_STORE_MODE=per_meeting → data/vectordb/<meeting_id>/ (default)
+# VECTOR_STORE_MODE=shared      → every meeting in one collection,
+#                                 filtered by the meeting_id metadata
+VECTOR_STORE_MODE = os.getenv("VECTOR_STORE_MODE", "per_meeting")
+SHARED_DIR = os.path.join(VECTORDB_DIR, "_shared")
+SHARED_COLLECTION = "meetings"
 
-    persist_directory = os.path.join(
-        "data",
-        "vectordb",
-        meeting_id
-    )
+# VECTOR_BACKEND=chroma → Chroma persistent client (default)
+# VECTOR_BACKEND=numpy  → per-meeting float32 matrix + JSON sidecar
+#                         (src/numpy_index.py); always per meeting
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma")
+
+# what to do when a meeting was embedded with another model than the
+# one used for queries: "reembed" it from the stored chunk text, or "refuse"
+EMBEDDING_MISMATCH = os.getenv("EMBEDDING_MISMATCH", "reembed")
 
-    collection_name = "meeting_chunks"
+# rows per collection.add() call (capped by what chroma accepts)
+WRITE_BATCH_SIZE = int(os.getenv("EMBED_WRITE_BATCH", "5000"))
 
-    chunks = []
+CHUNK_HEADER = re.compile(r"^----- CHUNK \d+ -----$", re.MULTILINE)
+
+
+def read_chunks_file(chunks_file: str):
+    """
+    Parse a chunks.txt written by chunk_text.write_chunks.
+    Splits on the exact header line, so chunk text is never cut.
+    """
 
     with open(chunks_file, "r", encoding="utf-8") as f:
         text = f.read()
 
-    raw_chunks = text.split("----- CHUNK")
+    return [
+        Chunk(c.strip())
+        for c in CHUNK_HEADER.split(text)
+        if c.strip()
+    ]
 
-    for c in raw_chunks:
-        c = c.strip()
-        if len(c) > 20:
-            chunks.append(c)
 
-    print(f"✅ Loaded {len(chunks)} chunks")
+def shared_mode() -> bool:
+    return VECTOR_STORE_MODE == "shared" and VECTOR_BACKEND == "chroma"
 
-    embeddings = model.encode(chunks).tolist()
 
-    os.makedirs(persist_directory, exist_ok=True)
+def numpy_backend() -> bool:
+    return VECTOR_BACKEND == "numpy"
+
 
-    client = chromadb.Client(
+def store_location(meeting_id: str):
+    """(persist_directory, collection_name) holding a meeting's chunks."""
+
+    if shared_mode():
+        return SHARED_DIR, SHARED_COLLECTION
+
+    return os.path.join(VECTORDB_DIR, meeting_id), COLLECTION_NAME
+
+
+def lexical_path(meeting_id: str):
+    """BM25 index of a meeting, stored next to its vectors."""
+
+    if shared_mode():
+        return os.path.join(SHARED_DIR, "bm25", f"{meeting_id}.json")
+
+    return os.path.join(VECTORDB_DIR, meeting_id, "bm25.json")
+
+
+def chunk_ids(meeting_id: str, start: int, count: int):
+    # ids must be unique across meetings in the shared collection
+    prefix = f"{meeting_id}:" if shared_mode() else ""
+    return [f"{prefix}{i}" for i in range(start, start + count)]
+
+
+def _client(persist_directory: str):
+    return chromadb.Client(
         settings=chromadb.Settings(
             persist_directory=persist_directory,
             is_persistent=True
         )
     )
 
-    collection = client.get_or_create_collection(collection_name)
 
-    collection.add(
-        documents=chunks,
-        embeddings=embeddings,
-        ids=[str(i) for i in range(len(chunks))]
+def add_batched(collection, client, ids, documents, embeddings, metadatas):
+    """
+    Bulk insert in as few calls as chroma allows. embeddings stay a
+    float32 numpy array; slicing it is free (views, no copies).
+    """
+
+    limit = WRITE_BATCH_SIZE
+    max_batch = getattr(client, "get_max_batch_size", None)
+    if max_batch is not None:
+        limit = min(limit, max_batch())
+
+    for i in range(0, len(ids), limit):
+        collection.add(
+            ids=ids[i:i + limit],
+            documents=documents[i:i + limit],
+            embeddings=embeddings[i:i + limit],
+            metadatas=metadatas[i:i + limit]
+        )
+
+
+def stored_embedding_model(collection) -> str:
+    return (collection.metadata or {}).get("embedding_model", LEGACY_EMBEDDING_MODEL)
+
+
+def list_meeting_ids():
+    """Meetings that have their own vector store directory (per_meeting mode)."""
+
+    if not os.path.isdir(VECTORDB_DIR):
+        return []
+
+    return [
+        name for name in os.listdir(VECTORDB_DIR)
+        if os.path.join(VECTORDB_DIR, name) != SHARED_DIR
+        and os.path.isdir(os.path.join(VECTORDB_DIR, name))
+    ]
+
+
+def ensure_embedding_model(meeting_id: str, model_name: str = None):
+    """
+    Make sure a meeting's vectors come from the query model.
+
+    EMBEDDING_MISMATCH=reembed → re-encode the stored chunk text with
+    the current model (collection is rebuilt, dimensions may differ).
+    EMBEDDING_MISMATCH=refuse  → raise ValueError.
+    """
+
+    model_name = model_name or EMBEDDING_MODEL
+
+    persist_directory, collection_name = store_location(meeting_id)
+
+    if numpy_backend():
+        sidecar = numpy_index.read_sidecar(persist_directory)
+        stored = sidecar["embedding_model"]
+    else:
+        client = _client(persist_directory)
+        collection = client.get_or_create_collection(collection_name)
+        stored = stored_embedding_model(collection)
+
+    if stored == model_name:
+        return
+
+    if EMBEDDING_MISMATCH != "reembed":
+        raise ValueError(
+            f"Meeting {meeting_id} was embedded with {stored}, "
+            f"queries use {model_name}"
+        )
+
+    if numpy_backend():
+        print(f"♻️ Re-embedding {persist_directory}: {stored} → {model_name}")
+        numpy_index.write_index(
+            persist_directory,
+            sidecar["documents"],
+            encode_chunks(sidecar["documents"], model_name),
+            sidecar["metadatas"],
+            model_name
+        )
+        return
+
+    # in shared mode this rebuilds the collection of ALL meetings
+    print(f"♻️ Re-embedding {persist_directory}: {stored} → {model_name}")
+
+    data = collection.get(include=["documents", "metadatas"])
+    metadata = {**(collection.metadata or {}), "embedding_model": model_name}
+
+    client.delete_collection(collection_name)
+    collection = client.create_collection(collection_name, metadata=metadata)
+
+    if data["ids"]:
+        add_batched(
+            collection, client,
+            data["ids"],
+            data["documents"],
+            encode_chunks(data["documents"], model_name),
+            data["metadatas"]
+        )
+
+
+def stored_chunks(meeting_id: str):
+    """(documents, metadatas) of a meeting, in chunk order."""
+
+    persist_directory, collection_name = store_location(meeting_id)
+
+    # opening a chroma client would create the directory
+    if not os.path.exists(persist_directory):
+        raise ValueError(f"Meeting not found: {meeting_id}")
+
+    if numpy_backend():
+        sidecar = numpy_index.read_sidecar(persist_directory)
+        return sidecar["documents"], sidecar["metadatas"]
+
+    collection = _client(persist_directory).get_collection(collection_name)
+    data = collection.get(
+        where={"meeting_id": meeting_id} if shared_mode() else None,
+        include=["documents", "metadatas"]
+    )
+
+    rows = sorted(
+        zip(data["documents"], data["metadatas"]),
+        key=lambda row: (row[1] or {}).get("chunk", 0)
+    )
+
+    return [d for d, _ in rows], [m or {} for _, m in rows]
+
+
+def build_lexical_index(meeting_id: str):
+    """BM25 index from the stored chunks (meetings ingested before it existed)."""
+
+    documents, metadatas = stored_chunks(meeting_id)
+    lexical_index.write_index(lexical_path(meeting_id), documents, metadatas)
+
+
+def embed_store(chunks, meeting_id: str, start_index: int = 0):
+    """
+    Store embeddings using SAME meeting_id from backend.
+    DO NOT generate new id here.
+
+    chunks:      list of Chunk (from the pipeline) or a chunks.txt path.
+    start_index: id of the first chunk, for appending to an existing
+                 meeting (live transcription).
+    """
+
+    if isinstance(chunks, (str, os.PathLike)):
+        chunks = read_chunks_file(chunks)
+
+    persist_directory, collection_name = store_location(meeting_id)
+
+    documents = [c.text for c in chunks]
+
+    print(f"✅ Loaded {len(documents)} chunks")
+
+    if not documents:
+        return None
+
+    # (n, dim) float32 array, no per-float Python lists
+    embeddings = encode_chunks(documents)
+
+    # chroma wants a non-empty dict per chunk and no None values
+    ingested_at = time.time()
+    metadatas = []
+    for i, c in enumerate(chunks, start_index):
+        meta = {"chunk": i, "meeting_id": meeting_id, "ingested_at": ingested_at}
+        if c.start is not None:
+            meta["start"] = c.start
+            meta["end"] = c.end
+        metadatas.append(meta)
+
+    os.makedirs(persist_directory, exist_ok=True)
+
+    if numpy_backend():
+        if start_index and numpy_index.has_index(persist_directory):
+            ensure_embedding_model(meeting_id)
+
+        numpy_index.write_index(
+            persist_directory, documents, embeddings, metadatas,
+            EMBEDDING_MODEL, start_index
+        )
+        lexical_index.write_index(
+            lexical_path(meeting_id), documents, metadatas, start_index
+        )
+
+        print(f"✅ Stored embeddings in: {persist_directory}")
+        return persist_directory
+
+    client = _client(persist_directory)
+
+    # record which model made these vectors → checked at query time
+    collection = client.get_or_create_collection(
+        collection_name,
+        metadata={"embedding_model": EMBEDDING_MODEL}
+    )
+
+    if not start_index and not shared_mode():
+        # fresh ingest replaces whatever was there (chroma would silently
+        # keep old rows whose ids come back, so drop them all)
+        client.delete_collection(collection_name)
+        collection = client.create_collection(
+            collection_name,
+            metadata={"embedding_model": EMBEDDING_MODEL}
+        )
+
+    elif stored_embedding_model(collection) != EMBEDDING_MODEL:
+        # keep what's there → bring it onto this model first
+        ensure_embedding_model(meeting_id)
+        collection = client.get_collection(collection_name)
+
+    if shared_mode() and not start_index:
+        # re-ingest of a meeting replaces its old chunks only
+        collection.delete(where={"meeting_id": meeting_id})
+
+    add_batched(
+        collection, client,
+        chunk_ids(meeting_id, start_index, len(documents)),
+        documents,
+        embeddings,
+        metadatas
+    )
+
+    # keyword index for hybrid retrieval (src/lexical_index.py)
+    lexical_index.write_index(
+        lexical_path(meeting_id), documents, metadatas, start_index
     )
 
     print(f"✅ Stored embeddings in: {persist_directory}")
@@ -0,0 +1,193 @@
+# src/embedding_cache.py
+
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CACHE_DIR = os.path.join(BASE_DIR, "data", "cache", "embeddings")
+
+# EMBED_CACHE=0 turns the cache off
+ENABLED = os.getenv("EMBED_CACHE", "1") != "0"
+# rows kept per model (384-dim float16 → ~0.75 KB a row)
+MAX_ROWS = int(os.getenv("EMBED_CACHE_MAX_ROWS", "200000"))
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+
+class EmbeddingCache:
+    """
+    Chunk text hash → embedding, for ONE model.
+
+    Vectors live in a fixed-size memory-mapped float16 matrix
+    (vectors.f16); index.json maps each hash to its row and keeps LRU
+    order. When full, the least recently used row is overwritten.
+
+    store() only appends its (hash, row) pairs to journal.jsonl; the
+    journal is folded into index.json once it grows past the index
+    itself, and at shutdown (close()).
+    """
+
+    def __init__(self, model_name: str, dim: int, capacity: int = MAX_ROWS):
+        safe = re.sub(r"[^A-Za-z0-9_.-]", "_", model_name)
+        self.dir = os.path.join(CACHE_DIR, safe)
+        self.dim = dim
+        self.capacity = capacity
+
+        self._lock = threading.Lock()
+        self._index = OrderedDict()     # hash → row, oldest first
+
+        os.makedirs(self.dir, exist_ok=True)
+
+        index_path = os.path.join(self.dir, "index.json")
+        vectors_path = os.path.join(self.dir, "vectors.f16")
+        self._journal_path = os.path.join(self.dir, "journal.jsonl")
+        self._journal_lines = 0
+
+        meta = None
+        if os.path.exists(index_path) and os.path.exists(vectors_path):
+            try:
+                with open(index_path, encoding="utf-8") as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                meta = None
+
+        if meta and meta.get("dim") == dim and meta.get("capacity") == capacity:
+            self._vectors = np.memmap(vectors_path, np.float16, "r+", shape=(capacity, dim))
+            self._index = OrderedDict((h, row) for h, row in meta["entries"])
+            self._replay()
+        else:
+            # new cache, or dim/capacity changed → start over
+            self._vectors = np.memmap(vectors_path, np.float16, "w+", shape=(capacity, dim))
+            self._compact()
+
+        used = set(self._index.values())
+        self._free = [row for row in range(capacity - 1, -1, -1) if row not in used]
+
+    def lookup(self, hashes):
+        """{hash: float32 vector} for the hashes that are cached."""
+
+        found = {}
+
+        with self._lock:
+            for h in hashes:
+                row = self._index.get(h)
+                if row is not None:
+                    self._index.move_to_end(h)
+                    found[h] = np.asarray(self._vectors[row], np.float32)
+
+        return found
+
+    def store(self, hashes, vectors):
+        with self._lock:
+            written = []
+
+            for h, vector in zip(hashes, vectors):
+                if h in self._index:
+                    self._index.move_to_end(h)
+                    continue
+
+                if self._free:
+                    row = self._free.pop()
+                else:
+                    _old, row = self._index.popitem(last=False)   # evict LRU
+
+                self._vectors[row] = vector
+                self._index[h] = row
+                written.append((h, row))
+
+            if not written:
+                return
+
+            self._vectors.flush()
+
+            with open(self._journal_path, "a", encoding="utf-8") as f:
+                f.writelines(json.dumps(entry) + "\n" for entry in written)
+            self._journal_lines += len(written)
+
+            if self._journal_lines > max(len(self._index), 1000):
+                self._compact()
+
+    def close(self):
+        with self._lock:
+            if self._journal_lines:
+                self._compact()
+
+    def _replay(self):
+        """Apply journal.jsonl on top of index.json (rows reused → old hash dropped)."""
+
+        try:
+            with open(self._journal_path, encoding="utf-8") as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return
+
+        by_row = {row: h for h, row in self._index.items()}
+
+        for line in lines:
+            try:
+                h, row = json.loads(line)
+            except ValueError:
+                break   # torn last line after a crash
+
+            old = by_row.get(row)
+            if old is not None and old != h:
+                self._index.pop(old, None)
+
+            self._index.pop(h, None)
+            self._index[h] = row
+            by_row[row] = h
+
+        self._journal_lines = len(lines)
+
+    def _compact(self):
+        """index.json ← current index, journal emptied. Caller holds the lock."""
+
+        self._vectors.flush()
+
+        index_path = os.path.join(self.dir, "index.json")
+        tmp_path = index_path + ".tmp"
+
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "dim": self.dim,
+                "capacity": self.capacity,
+                "entries": list(self._index.items()),
+            }, f)
+        os.replace(tmp_path, index_path)
+
+        # only after index.json holds everything it recorded
+        if os.path.exists(self._journal_path):
+            os.remove(self._journal_path)
+        self._journal_lines = 0
+
+    def __len__(self):
+        return len(self._index)
+
+
+def get_cache(model_name: str, dim: int) -> EmbeddingCache:
+    with _caches_lock:
+        if model_name not in _caches:
+            _caches[model_name] = EmbeddingCache(model_name, dim)
+        return _caches[model_name]
+
+
+def close_caches():
+    """Fold every journal into its index.json (app shutdown)."""
+
+    with _caches_lock:
+        caches = list(_caches.values())
+
+    for cache in caches:
+        cache.close()
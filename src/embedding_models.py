@@ -0,0 +1,143 @@
+# src/embedding_models.py
+
+import os
+import threading
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from sentence_transformers import SentenceTransformer
+
+from src import embedding_cache
+
+# one model for ingest AND queries → vectors are comparable
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "paraphrase-multilingual-MiniLM-L12-v2")
+
+# meetings stored before the model was recorded were embedded with this
+LEGACY_EMBEDDING_MODEL = "paraphrase-multilingual-MiniLM-L12-v2"
+
+# chunks per forward pass
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+# EMBED_WORKERS > 1 → big transcripts are encoded by a multi-process pool
+EMBED_WORKERS = int(os.getenv("EMBED_WORKERS", "1"))
+# ... but only when there are at least this many chunks (pool has overhead)
+EMBED_POOL_MIN_CHUNKS = int(os.getenv("EMBED_POOL_MIN_CHUNKS", "2000"))
+
+_models = {}
+_embeddings = {}
+_pools = {}
+_lock = threading.Lock()
+
+
+def get_model(name: str = None) -> SentenceTransformer:
+    """Process-wide SentenceTransformer, loaded lazily, exactly once per name."""
+
+    name = name or EMBEDDING_MODEL
+
+    with _lock:
+        if name not in _models:
+            print(f"📦 Loading embedding model: {name}")
+            _models[name] = SentenceTransformer(name)
+
+        return _models[name]
+
+
+def _get_pool(name):
+    """sentence-transformers worker pool, started once per model."""
+
+    with _lock:
+        if name not in _pools:
+            model = _models[name]
+            _pools[name] = model.start_multi_process_pool(
+                target_devices=["cpu"] * EMBED_WORKERS
+            )
+        return _pools[name]
+
+
+def _encode(model, name, texts):
+    if EMBED_WORKERS > 1 and len(texts) >= EMBED_POOL_MIN_CHUNKS:
+        return model.encode_multi_process(
+            texts, _get_pool(name), batch_size=EMBED_BATCH_SIZE
+        )
+
+    return model.encode(
+        texts,
+        batch_size=EMBED_BATCH_SIZE,
+        convert_to_numpy=True
+    )
+
+
+def encode_chunks(texts, model_name: str = None, dtype=np.float32, use_cache=True) -> np.ndarray:
+    """
+    texts → (n, dim) C-contiguous array, float32 by default
+    (float16 halves the size for caches / on-disk indexes).
+
+    Encodes in EMBED_BATCH_SIZE batches; with EMBED_WORKERS > 1 and a
+    large enough input the batches are spread over a process pool.
+    Texts already in the embedding cache (src/embedding_cache.py) are
+    not encoded again.
+    """
+
+    name = model_name or EMBEDDING_MODEL
+    model = get_model(name)
+    texts = list(texts)
+    dim = model.get_sentence_embedding_dimension()
+
+    if not texts:
+        return np.zeros((0, dim), dtype)
+
+    if not (use_cache and embedding_cache.ENABLED):
+        return np.ascontiguousarray(_encode(model, name, texts), dtype=dtype)
+
+    cache = embedding_cache.get_cache(name, dim)
+    hashes = [embedding_cache.text_hash(t) for t in texts]
+    found = cache.lookup(hashes)
+
+    missing = {}
+    for h, t in zip(hashes, texts):
+        if h not in found and h not in missing:
+            missing[h] = t
+
+    if missing:
+        fresh = _encode(model, name, list(missing.values()))
+        # round through float16 like cached rows → same result hit or miss
+        fresh = np.asarray(fresh, np.float16).astype(np.float32)
+        cache.store(list(missing), fresh)
+        found.update(zip(missing, fresh))
+
+    print(f"🧠 Embedded {len(missing)} new / {len(texts) - len(missing)} cached chunks")
+
+    vectors = np.empty((len(texts), dim), dtype)
+    for i, h in enumerate(hashes):
+        vectors[i] = found[h]
+
+    return vectors
+
+
+def stop_pools():
+    with _lock:
+        for name, pool in _pools.items():
+            _models[name].stop_multi_process_pool(pool)
+        _pools.clear()
+
+
+class SharedEmbeddings(Embeddings):
+    """LangChain wrapper around the shared model (no second copy in RAM)."""
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+
+    def embed_documents(self, texts):
+        return encode_chunks(texts, self.model_name).tolist()
+
+    def embed_query(self, text):
+        return get_model(self.model_name).encode(text).tolist()
+
+
+def get_embeddings(name: str = None) -> SharedEmbeddings:
+    name = name or EMBEDDING_MODEL
+
+    with _lock:
+        if name not in _embeddings:
+            _embeddings[name] = SharedEmbeddings(name)
+
+        return _embeddings[name]
@@ -0,0 +1,159 @@
+# src/exports.py
+
+import glob
+import hashlib
+import os
+import threading
+from datetime import datetime
+
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+from reportlab.lib.styles import getSampleStyleSheet
+from docx import Document
+
+from src import meeting_store
+from src.highlights import stored_highlights
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+EXPORT_DIR = os.path.join(BASE_DIR, "data", "cache", "exports")
+
+# bump when the layout of a rendered file changes → old renders are ignored
+RENDER_VERSION = "1"
+
+MEDIA_TYPES = {
+    "pdf": "application/pdf",
+    "txt": "text/plain",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+
+# one lock per artifact → concurrent requests wait for a single render
+_locks = {}
+_locks_lock = threading.Lock()
+
+
+class Export:
+    """Everything needed to answer a download without rendering."""
+
+    def __init__(self, meeting_id, fmt, name, text, generated):
+        self.meeting_id = meeting_id
+        self.format = fmt
+        self.name = name
+        self.text = text
+        self.generated = generated
+
+        self.key = hashlib.sha256("\n".join([
+            RENDER_VERSION, fmt, name, generated, text
+        ]).encode("utf-8")).hexdigest()[:20]
+
+        self.etag = f'"{self.key}"'
+        self.path = os.path.join(EXPORT_DIR, f"{meeting_id}_{self.key}.{fmt}")
+        self.filename = f"{name}.{fmt}"
+        self.media_type = MEDIA_TYPES[fmt]
+
+
+def _meeting_name(meeting_id: str) -> str:
+    meeting_name = meeting_store.get_name(meeting_id) or meeting_id
+
+    return "".join(
+        c for c in meeting_name if c.isalnum() or c in (" ", "-", "_")
+    ).strip() or meeting_id
+
+
+def prepare(meeting_id: str, fmt: str):
+    """
+    Export for a meeting's highlights, or None if there are no current
+    ones (missing, or made with other prompts/model → stale).
+    Cheap (two small reads) → enough to answer If-None-Match.
+    """
+
+    if fmt not in MEDIA_TYPES:
+        raise ValueError(f"Invalid format: {fmt}")
+
+    stored = stored_highlights(meeting_id)
+
+    if stored is None:
+        return None
+
+    # the notes' own time, not the download time → identical renders are reusable
+    generated = datetime.fromtimestamp(stored["created_at"]).strftime("%d %b %Y, %I:%M %p")
+
+    return Export(meeting_id, fmt, _meeting_name(meeting_id), stored["notes"], generated)
+
+
+# ===============================
+# Renderers
+# ===============================
+def _render_pdf(export, path):
+    doc = SimpleDocTemplate(path)
+    styles = getSampleStyleSheet()
+    elements = []
+
+    elements.append(Paragraph("Meeting Highlights", styles["Heading1"]))
+    elements.append(Spacer(1, 20))
+    elements.append(Paragraph(f"Meeting: {export.name}", styles["Normal"]))
+    elements.append(Paragraph(f"Generated: {export.generated}", styles["Normal"]))
+    elements.append(Spacer(1, 20))
+
+    for line in export.text.split("\n"):
+        elements.append(Paragraph(line, styles["BodyText"]))
+        elements.append(Spacer(1, 8))
+
+    doc.build(elements)
+
+
+def _render_txt(export, path):
+    header = f"Meeting: {export.name}\nGenerated: {export.generated}\n\n"
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(header + export.text)
+
+
+def _render_docx(export, path):
+    document = Document()
+    document.add_heading("Meeting Highlights", 0)
+    document.add_paragraph(f"Meeting: {export.name}")
+    document.add_paragraph(f"Generated: {export.generated}")
+    document.add_paragraph("")
+
+    for line in export.text.split("\n"):
+        document.add_paragraph(line)
+
+    document.save(path)
+
+
+RENDERERS = {"pdf": _render_pdf, "txt": _render_txt, "docx": _render_docx}
+
+
+def render(export: Export) -> str:
+    """
+    Path of the rendered file, rendering it only if no cached copy
+    exists. Blocking → call from a worker thread.
+    """
+
+    with _locks_lock:
+        lock = _locks.setdefault(export.path, threading.Lock())
+
+    with lock:
+        if os.path.exists(export.path):
+            return export.path
+
+        os.makedirs(EXPORT_DIR, exist_ok=True)
+
+        tmp_path = f"{export.path}.tmp"
+        RENDERERS[export.format](export, tmp_path)
+        os.replace(tmp_path, export.path)
+
+        print(f"📄 Rendered {export.format} for {export.meeting_id}")
+
+        # older renders of this meeting + format are stale now
+        for old in glob.glob(os.path.join(EXPORT_DIR, f"{export.meeting_id}_*.{export.format}")):
+            if old != export.path:
+                try:
+                    os.remove(old)
+                except OSError:
+                    pass
+
+    with _locks_lock:
+        _locks.pop(export.path, None)
+
+    return export.path
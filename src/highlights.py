@@ -1,89 +1,372 @@
-from langchain_chroma import Chroma
-from langchain_community.embeddings import SentenceTransformerEmbeddings
-from langchain_groq import ChatGroq
 from langchain_core.prompts import ChatPromptTemplate
+import asyncio
+import hashlib
+import json
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
+from src import meeting_store
+from src.embed_store import stored_chunks
+from src.embedding_models import get_embeddings
+from src.llm_gateway import current_priority, get_llm, priority
+from src.vectorstore import search_many
+
 load_dotenv()
 
 
-def extract_highlights(meeting_id: str):
+# ========= Modes =========
+# NOTES_MODE=fast       → 5 queries, one batched similarity call, top chunks only
+# NOTES_MODE=map_reduce → every transcript window summarised in parallel, then merged
+# NOTES_MODE=auto       → map_reduce once a meeting has NOTES_MAP_REDUCE_MIN_CHUNKS chunks
+NOTES_MODE = os.getenv("NOTES_MODE", "auto")
+NOTES_MAP_REDUCE_MIN_CHUNKS = int(os.getenv("NOTES_MAP_REDUCE_MIN_CHUNKS", "24"))
+# chunks per map window (~150 words each)
+NOTES_WINDOW_CHUNKS = int(os.getenv("NOTES_WINDOW_CHUNKS", "20"))
+# map calls in flight at once (bounded → stays under LLM rate limits)
+NOTES_WORKERS = int(os.getenv("NOTES_WORKERS", "4"))
 
-    print("🔍 Extracting meeting highlights...")
+_map_pool = ThreadPoolExecutor(max_workers=NOTES_WORKERS, thread_name_prefix="notes-map")
 
-    # ========= Embedding =========
-    embedding = SentenceTransformerEmbeddings(
-        model_name="all-MiniLM-L6-v2"
-    )
 
-    # ========= LOAD MEETING-SPECIFIC DB =========
-    db_path = os.path.join("data", "vectordb", meeting_id)
+# ========= Queries (Improved) =========
+queries = [
+    "important topics discussed",
+    "key decisions made",
+    "tasks assigned or action items",
+    "deadlines or commitments",
+    "critical points or conclusions"
+]
 
-    db = Chroma(
-        persist_directory=db_path,
-        embedding_function=embedding,
-        collection_name="meeting_chunks"
-    )
+# ========= Prompt (Upgraded Intelligence) =========
+prompt = ChatPromptTemplate.from_template("""
+You are an expert meeting analyst.
 
-    retriever = db.as_retriever(search_kwargs={"k": 6})
+Extract only the MOST IMPORTANT highlights.
 
-    # ========= Queries (Improved) =========
-    queries = [
-        "important topics discussed",
-        "key decisions made",
-        "tasks assigned or action items",
-        "deadlines or commitments",
-        "critical points or conclusions"
-    ]
+Rules:
+- Only include decisions, action items, deadlines, or key conclusions
+- Ignore filler conversation or casual talk
+- Each highlight must be one concise sentence
+- Do NOT repeat similar points
+- Maximum 8 highlights
 
-    chunks = []
+Format:
+• Highlight
 
-    for q in queries:
-        docs = retriever.invoke(q)
-        chunks.extend([d.page_content.strip() for d in docs])
+Meeting Text:
+{text}
+""")
 
-    # ========= Remove duplicate chunks =========
-    unique_chunks = list(dict.fromkeys(chunks))
+# ========= Map / Reduce prompts =========
+map_prompt = ChatPromptTemplate.from_template("""
+You are an expert meeting analyst.
 
-    # ========= Limit context size =========
-    context = "\n\n".join(unique_chunks[:12])
+Below is ONE PART of a longer meeting transcript.
+List the decisions, action items, deadlines and key conclusions in it.
 
-    # ========= LLM =========
-    llm = ChatGroq(
-        model_name="openai/gpt-oss-120b",
-        temperature=0
-    )
+Rules:
+- One concise sentence per point
+- Keep names, numbers and dates exactly
+- Ignore filler conversation or casual talk
+- If there is nothing important, answer: NONE
+
+Format:
+• Point
+
+Transcript Part:
+{text}
+""")
 
-    # ========= Prompt (Upgraded Intelligence) =========
-    prompt = ChatPromptTemplate.from_template("""
+reduce_prompt = ChatPromptTemplate.from_template("""
 You are an expert meeting analyst.
 
-Extract only the MOST IMPORTANT highlights.
+Below are notes taken from consecutive parts of ONE meeting.
+Merge them into the MOST IMPORTANT highlights of the whole meeting.
 
 Rules:
 - Only include decisions, action items, deadlines, or key conclusions
-- Ignore filler conversation or casual talk
+- Merge duplicates and points that were revised later (keep the final version)
 - Each highlight must be one concise sentence
-- Do NOT repeat similar points
 - Maximum 8 highlights
 
 Format:
 • Highlight
 
-Meeting Text:
+Notes by Part:
 {text}
 """)
 
-    chain = prompt | llm
 
-    result = chain.invoke({"text": context}).content
+# one shared model; parallel map calls are rate limited by the gateway
+llm = get_llm(
+    model_name="openai/gpt-oss-120b",
+    temperature=0
+)
+
+
+# ========= Cache key =========
+# notes made with other prompts / model / mode are stale
+NOTES_VERSION = hashlib.sha256("\n".join([
+    prompt.messages[0].prompt.template,
+    map_prompt.messages[0].prompt.template,
+    reduce_prompt.messages[0].prompt.template,
+    llm.model_name,
+    NOTES_MODE,
+]).encode("utf-8")).hexdigest()[:16]
+
+# one generation per meeting at a time (precompute vs. /notes)
+_locks = {}
+_locks_lock = threading.Lock()
+
+
+def _meeting_lock(meeting_id: str):
+    with _locks_lock:
+        return _locks.setdefault(meeting_id, threading.Lock())
+
+
+# ===============================
+# FAST → one batched similarity call
+# ===============================
+def fast_context(meeting_id: str) -> str:
+    """Chunks closest to the highlight queries, deduplicated and capped."""
+
+    # all five queries embedded in one batch, searched in one call
+    vectors = get_embeddings().embed_documents(queries)
+
+    chunks = []
+
+    for docs in search_many(meeting_id, vectors, k=6):
+        chunks.extend([d.page_content.strip() for d in docs])
+
+    # ========= Remove duplicate chunks =========
+    unique_chunks = list(dict.fromkeys(chunks))
+
+    # ========= Limit context size =========
+    return "\n\n".join(unique_chunks[:12])
+
+
+# ===============================
+# MAP-REDUCE → whole transcript
+# ===============================
+def windows(documents, size=NOTES_WINDOW_CHUNKS):
+    return [
+        "\n\n".join(documents[i:i + size])
+        for i in range(0, len(documents), size)
+    ]
+
+
+def _join_parts(notes) -> str:
+    return "\n\n".join(
+        f"Part {i}:\n{n}"
+        for i, n in enumerate(notes, start=1)
+        if n and n.upper() != "NONE"
+    )
+
+
+def map_notes(documents) -> str:
+    """Notes for every window (in parallel), joined in meeting order."""
+
+    chain = map_prompt | llm
+    parts = list(windows(documents))
+    level = current_priority()     # map threads inherit the caller's
+
+    print(f"🗺️ Summarising {len(parts)} transcript windows...")
+
+    def summarise(text):
+        with priority(level):
+            return chain.invoke({"text": text}).content.strip()
+
+    return _join_parts(_map_pool.map(summarise, parts))
+
 
-    # ========= Save =========
+async def amap_notes(documents) -> str:
+    """map_notes for the event loop: NOTES_WORKERS calls awaited at once, no threads held."""
+
+    chain = map_prompt | llm
+    parts = list(windows(documents))
+    limit = asyncio.Semaphore(NOTES_WORKERS)
+
+    print(f"🗺️ Summarising {len(parts)} transcript windows...")
+
+    async def summarise(text):
+        async with limit:
+            return (await chain.ainvoke({"text": text})).content.strip()
+
+    return _join_parts(await asyncio.gather(*(summarise(text) for text in parts)))
+
+
+def _mode(meeting_id: str):
+    """(mode, documents) with "auto" resolved; documents only for map_reduce."""
+
+    if NOTES_MODE == "fast":
+        return "fast", None
+
+    documents, _ = stored_chunks(meeting_id)
+
+    if NOTES_MODE == "auto" and len(documents) < NOTES_MAP_REDUCE_MIN_CHUNKS:
+        return "fast", None
+
+    return "map_reduce", documents
+
+
+def prepare(meeting_id: str):
+    """(chain, inputs) for the final highlights call, in the configured mode."""
+
+    mode, documents = _mode(meeting_id)
+
+    if mode == "fast":
+        return prompt | llm, {"text": fast_context(meeting_id)}
+
+    return reduce_prompt | llm, {"text": map_notes(documents)}
+
+
+async def aprepare(meeting_id: str):
+    """prepare() with the map calls awaited; retrieval runs in a worker thread."""
+
+    mode, documents = await asyncio.to_thread(_mode, meeting_id)
+
+    if mode == "fast":
+        return prompt | llm, {"text": await asyncio.to_thread(fast_context, meeting_id)}
+
+    return reduce_prompt | llm, {"text": await amap_notes(documents)}
+
+
+# ===============================
+# Stored notes
+# ===============================
+def _cache_path(meeting_id: str):
+    return f"Notes/highlights_{meeting_id}.json"
+
+
+def save_highlights(meeting_id: str, result: str):
     os.makedirs("Notes", exist_ok=True)
 
+    # .txt → read by /download-notes
     with open(f"Notes/highlights_{meeting_id}.txt", "w", encoding="utf-8") as f:
         f.write(result)
 
+    with open(_cache_path(meeting_id), "w", encoding="utf-8") as f:
+        json.dump({
+            "version": NOTES_VERSION,
+            "created_at": time.time(),
+            "notes": result,
+        }, f)
+
+    meeting_store.add_artifact(meeting_id, "notes", f"Notes/highlights_{meeting_id}.txt")
+
     print("✅ Highlights saved")
-    return result
+
+
+def stored_highlights(meeting_id: str):
+    """{"notes", "created_at", ...} made with the current prompts/model, else None."""
+
+    try:
+        with open(_cache_path(meeting_id), encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if data.get("version") != NOTES_VERSION or data.get("notes") is None:
+        return None
+
+    return data
+
+
+def cached_highlights(meeting_id: str):
+    """Stored notes made with the current prompts/model, else None."""
+
+    data = stored_highlights(meeting_id)
+    return data["notes"] if data else None
+
+
+def forget_highlights(meeting_id: str):
+    """Drop stored notes, .txt included (the meeting was re-ingested)."""
+
+    for path in (_cache_path(meeting_id), f"Notes/highlights_{meeting_id}.txt"):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+async def _locked(lock):
+    """Hold a threading.Lock from the event loop without parking a thread on it."""
+
+    while not lock.acquire(blocking=False):
+        await asyncio.sleep(0.2)
+
+
+def extract_highlights(meeting_id: str, regenerate: bool = False):
+    """Blocking version, for the background precompute."""
+
+    with _meeting_lock(meeting_id):
+        if not regenerate:
+            cached = cached_highlights(meeting_id)
+            if cached is not None:
+                return cached
+
+        print("🔍 Extracting meeting highlights...")
+
+        chain, inputs = prepare(meeting_id)
+
+        result = chain.invoke(inputs).content
+
+        save_highlights(meeting_id, result)
+        return result
+
+
+async def aextract_highlights(meeting_id: str, regenerate: bool = False):
+    """extract_highlights for FastAPI: LLM calls are awaited, not waited on in a thread."""
+
+    lock = _meeting_lock(meeting_id)
+    await _locked(lock)
+
+    try:
+        if not regenerate:
+            cached = await asyncio.to_thread(cached_highlights, meeting_id)
+            if cached is not None:
+                return cached
+
+        print("🔍 Extracting meeting highlights...")
+
+        chain, inputs = await aprepare(meeting_id)
+
+        result = (await chain.ainvoke(inputs)).content
+
+        await asyncio.to_thread(save_highlights, meeting_id, result)
+        return result
+
+    finally:
+        lock.release()
+
+
+async def stream_highlights(meeting_id: str, regenerate: bool = False):
+    """Like aextract_highlights, but yields the text as the LLM writes it."""
+
+    lock = _meeting_lock(meeting_id)
+    await _locked(lock)
+
+    try:
+        if not regenerate:
+            cached = await asyncio.to_thread(cached_highlights, meeting_id)
+            if cached is not None:
+                yield cached
+                return
+
+        print("🔍 Streaming meeting highlights...")
+
+        chain, inputs = await aprepare(meeting_id)
+
+        parts = []
+        async for piece in chain.astream(inputs):
+            if piece.content:
+                parts.append(piece.content)
+                yield piece.content
+
+        await asyncio.to_thread(save_highlights, meeting_id, "".join(parts))
+
+    finally:
+        lock.release()
@@ -0,0 +1,98 @@
+# src/hybrid_retriever.py
+
+import os
+from typing import Any, Optional
+
+from langchain_core.retrievers import BaseRetriever
+
+# share of the fused score that comes from BM25 (rest: vector similarity)
+LEXICAL_WEIGHT = float(os.getenv("HYBRID_LEXICAL_WEIGHT", "0.5"))
+# candidates taken from each side before fusing
+HYBRID_FETCH_K = int(os.getenv("HYBRID_FETCH_K", "20"))
+
+
+def _key(doc):
+    return (doc.metadata or {}).get("chunk", doc.page_content)
+
+
+def _normalised(scored, higher_is_better=True):
+    """{key: score in [0, 1]} by min-max over the candidates; best → 1."""
+
+    if not scored:
+        return {}
+
+    values = [s for _, s in scored]
+    low, high = min(values), max(values)
+    span = high - low
+
+    out = {}
+    for doc, s in scored:
+        if span == 0:
+            out[_key(doc)] = 1.0
+        elif higher_is_better:
+            out[_key(doc)] = (s - low) / span
+        else:
+            out[_key(doc)] = (high - s) / span
+    return out
+
+
+def fuse(vector_hits, lexical_hits, k, lexical_weight=LEXICAL_WEIGHT):
+    """
+    Weighted fusion of min-max normalised scores.
+
+    vector_hits:  [(Document, distance)]  lower is better
+    lexical_hits: [(Document, bm25)]      higher is better, best first
+
+    A chunk missing from one list gets 0 on that side. The best BM25
+    hit is always kept: an exact name/number/date match is the case
+    hybrid retrieval exists for, and it must not be outvoted by chunks
+    that are mediocre on both sides.
+    """
+
+    vector = _normalised(vector_hits, higher_is_better=False)
+    lexical = _normalised(lexical_hits)
+
+    docs = {}
+    for doc, _ in list(vector_hits) + list(lexical_hits):
+        docs.setdefault(_key(doc), doc)
+
+    scores = {
+        key: (1 - lexical_weight) * vector.get(key, 0.0) + lexical_weight * lexical.get(key, 0.0)
+        for key in docs
+    }
+
+    best = sorted(scores, key=scores.get, reverse=True)[:k]
+
+    if lexical_hits and k > 0:
+        top_lexical = _key(lexical_hits[0][0])
+        if top_lexical not in best:
+            best = best[:k - 1] + [top_lexical]
+
+    return [docs[key] for key in best]
+
+
+class HybridRetriever(BaseRetriever):
+    """
+    Vector + BM25 retrieval over ONE meeting, fused by weighted
+    normalised scores (see fuse()).
+
+    store:   vector store (Chroma or NumpyIndex)
+    lexical: BM25Index of the same meeting
+    filter:  metadata filter for the vector side (shared mode)
+    """
+
+    store: Any
+    lexical: Any
+    k: int = 4
+    fetch_k: int = HYBRID_FETCH_K
+    filter: Optional[dict] = None
+
+    def _get_relevant_documents(self, query, *, run_manager=None):
+        fetch_k = max(self.fetch_k, self.k)
+
+        vector_hits = self.store.similarity_search_with_score(
+            query, k=fetch_k, filter=self.filter
+        )
+        lexical_hits = self.lexical.search(query, fetch_k)
+
+        return fuse(vector_hits, lexical_hits, self.k)
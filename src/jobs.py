@@ -0,0 +1,201 @@
+# src/jobs.py
+
+import json
+import os
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from uuid import uuid4
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+JOBS_FILE = os.path.join(BASE_DIR, "data", "jobs.json")
+
+# how many meetings may run through the pipeline at the same time
+MAX_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+
+# finished jobs kept in the state file
+MAX_HISTORY = int(os.getenv("JOB_HISTORY", "500"))
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+def _now():
+    return datetime.now().isoformat(timespec="seconds")
+
+
+class JobQueue:
+    """
+    Runs meeting processing in a bounded worker pool.
+
+    handler(file_path, meeting_id, progress) does the actual work and
+    may call progress(stage, fraction) to report where it is.
+
+    Job state is written to a JSON file on every change so it
+    survives a server restart.
+
+    on_failure(meeting_id, error) is optional and is called whenever a
+    job ends up failed, including jobs interrupted by a restart.
+    """
+
+    def __init__(self, handler, state_file=JOBS_FILE, max_workers=MAX_WORKERS,
+                 on_failure=None):
+        self.handler = handler
+        self.on_failure = on_failure
+        self.state_file = state_file
+        self.executor = ThreadPoolExecutor(
+            max_workers=max(1, max_workers),
+            thread_name_prefix="meeting-job"
+        )
+        self._lock = threading.Lock()
+        self._jobs = self._load()
+        self._resume()
+
+    # ===============================
+    # Public API
+    # ===============================
+    def submit(self, meeting_id: str, file_path: str) -> dict:
+        job_id = uuid4().hex
+
+        job = {
+            "job_id": job_id,
+            "meeting_id": meeting_id,
+            "file_path": file_path,
+            "status": QUEUED,
+            "stage": QUEUED,
+            "progress": 0.0,
+            "error": None,
+            "created_at": _now(),
+            "updated_at": _now(),
+        }
+
+        with self._lock:
+            self._jobs[job_id] = job
+            self._save()
+
+        self.executor.submit(self._run, job_id)
+
+        return dict(job)
+
+    def get(self, job_id: str):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def list(self):
+        with self._lock:
+            jobs = [dict(j) for j in self._jobs.values()]
+
+        jobs.sort(key=lambda j: j["created_at"], reverse=True)
+        return jobs
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    # ===============================
+    # Worker
+    # ===============================
+    def _run(self, job_id: str):
+        job = self.get(job_id)
+        if job is None:
+            return
+
+        self._update(job_id, status=RUNNING, stage="starting")
+
+        def progress(stage, fraction=None):
+            fields = {"stage": stage}
+            if fraction is not None:
+                fields["progress"] = round(float(fraction), 3)
+            self._update(job_id, **fields)
+
+        try:
+            self.handler(job["file_path"], job["meeting_id"], progress)
+            self._update(job_id, status=DONE, stage=DONE, progress=1.0)
+
+        except Exception as e:
+            traceback.print_exc()
+            error = str(e) or type(e).__name__
+            self._update(job_id, status=FAILED, error=error)
+            self._failed(job["meeting_id"], error)
+
+    def _failed(self, meeting_id: str, error: str):
+        if self.on_failure is None:
+            return
+
+        try:
+            self.on_failure(meeting_id, error)
+        except Exception:
+            traceback.print_exc()
+
+    def _update(self, job_id: str, **fields):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job.update(fields)
+            job["updated_at"] = _now()
+            self._save()
+
+    # ===============================
+    # Persistence
+    # ===============================
+    def _load(self):
+        if not os.path.exists(self.state_file):
+            return {}
+
+        try:
+            with open(self.state_file, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            traceback.print_exc()
+            return {}
+
+    def _save(self):
+        """Caller must hold self._lock."""
+
+        finished = [
+            j for j in self._jobs.values()
+            if j["status"] in (DONE, FAILED)
+        ]
+        if len(finished) > MAX_HISTORY:
+            finished.sort(key=lambda j: j["updated_at"])
+            for j in finished[:len(finished) - MAX_HISTORY]:
+                del self._jobs[j["job_id"]]
+
+        os.makedirs(os.path.dirname(self.state_file), exist_ok=True)
+
+        tmp_path = self.state_file + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._jobs, f, indent=2)
+        os.replace(tmp_path, self.state_file)
+
+    def _resume(self):
+        """
+        Jobs that were still queued when the server stopped are queued
+        again. Jobs that were mid-run cannot be resumed safely, so they
+        are marked failed.
+        """
+
+        requeue = []
+        interrupted = []
+
+        with self._lock:
+            for job in self._jobs.values():
+                if job["status"] == RUNNING:
+                    job["status"] = FAILED
+                    job["error"] = "Interrupted by server restart"
+                    job["updated_at"] = _now()
+                    interrupted.append(job["meeting_id"])
+                elif job["status"] == QUEUED:
+                    requeue.append(job["job_id"])
+            self._save()
+
+        for meeting_id in interrupted:
+            self._failed(meeting_id, "Interrupted by server restart")
+
+        for job_id in requeue:
+            self.executor.submit(self._run, job_id)
@@ -0,0 +1,144 @@
+# src/lexical_index.py
+
+import json
+import os
+import re
+import threading
+from collections import Counter
+
+import numpy as np
+from langchain_core.documents import Document
+
+# Okapi BM25 parameters
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+TOKEN = re.compile(r"\w+", re.UNICODE)
+
+# dropped from queries only (the index keeps them → doc lengths unchanged),
+# so "what was the budget" scores on "budget" alone
+STOPWORDS = frozenset("""
+a about after all also am an and any are as at be been before being both but by
+can could did do does doing done for from had has have having he her here hers him
+his how i if in into is it its me more most my no nor not of off on once only or
+other our out over own same she should so some such than that the their them then
+there these they this those through to too under until up us very was we were what
+when where which while who whom why will with would you your
+""".split())
+
+
+def tokenize(text: str):
+    """Lowercased word/number tokens; keeps names, figures and date parts."""
+
+    return TOKEN.findall(text.lower())
+
+
+def write_index(path, documents, metadatas, start_index=0):
+    """
+    Build (or append to, from start_index) a meeting's inverted index
+    and save it as JSON: chunk text, metadata, lengths and postings.
+    """
+
+    documents = list(documents)
+    metadatas = list(metadatas)
+
+    if start_index and os.path.exists(path):
+        old = read_index(path)
+        documents = old["documents"][:start_index] + documents
+        metadatas = old["metadatas"][:start_index] + metadatas
+
+    postings = {}
+    lengths = []
+
+    for i, text in enumerate(documents):
+        tokens = tokenize(text)
+        lengths.append(len(tokens))
+
+        for term, tf in Counter(tokens).items():
+            postings.setdefault(term, []).append([i, tf])
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "documents": documents,
+            "metadatas": metadatas,
+            "lengths": lengths,
+            "postings": postings,
+        }, f)
+    os.replace(tmp_path, path)
+
+
+def read_index(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class BM25Index:
+    """
+    Keyword side of hybrid retrieval for ONE meeting.
+
+    Exact names, numbers and dates that the embedding model blurs
+    together still match here. Reloads by itself when the file changes
+    (live transcription appends).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._load()
+
+    def _load(self):
+        mtime = os.stat(self.path).st_mtime_ns
+        if mtime == self._mtime:
+            return
+
+        data = read_index(self.path)
+
+        self.documents = data["documents"]
+        self.metadatas = data["metadatas"]
+        self.lengths = np.asarray(data["lengths"], np.float32)
+        self.postings = {
+            term: np.asarray(rows, np.int64).reshape(-1, 2)
+            for term, rows in data["postings"].items()
+        }
+        self._mtime = mtime
+
+    def search(self, query: str, k: int):
+        """[(Document, score)] best first; chunks without any query term are left out."""
+
+        with self._lock:
+            self._load()
+            documents, metadatas = self.documents, self.metadatas
+            lengths, postings = self.lengths, self.postings
+
+        n = len(documents)
+        if n == 0:
+            return []
+
+        avg_len = max(float(lengths.mean()), 1.0)
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / avg_len)
+        scores = np.zeros(n, np.float32)
+
+        for term in set(tokenize(query)) - STOPWORDS:
+            rows = postings.get(term)
+            if rows is None:
+                continue
+
+            docs, tf = rows[:, 0], rows[:, 1].astype(np.float32)
+            idf = np.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            scores[docs] += idf * tf * (BM25_K1 + 1) / (tf + norm[docs])
+
+        k = min(k, int(np.count_nonzero(scores)))
+        if k == 0:
+            return []
+
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        return [
+            (Document(page_content=documents[i], metadata=metadatas[i]), float(scores[i]))
+            for i in top
+        ]
@@ -0,0 +1,213 @@
+# src/live.py
+
+import os
+import threading
+import traceback
+
+import numpy as np
+
+from src import answer_cache
+from src.audio_to_text import transcribe, SAMPLE_RATE
+from src.chunk_text import split_segments
+from src.embed_store import embed_store
+from src.vad import has_speech, last_pause
+
+# audio collected before each live transcription pass
+LIVE_WINDOW_SECONDS = float(os.getenv("LIVE_WINDOW_SECONDS", "30"))
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+class LiveSession:
+    """
+    Transcribes, chunks and embeds a recording while it is running.
+
+    The recorder calls feed() with mono blocks. A worker thread cuts the
+    buffered audio at a pause every ~LIVE_WINDOW_SECONDS, transcribes it
+    and appends the chunks to the meeting's vector store, so stopping
+    only has to process the last window.
+    """
+
+    def __init__(self, meeting_id: str, window_seconds=LIVE_WINDOW_SECONDS):
+        self.meeting_id = meeting_id
+        self.window = int(window_seconds * SAMPLE_RATE)
+
+        self.segments = []      # everything transcribed so far (read by SSE)
+        self.done = False
+        self.error = None
+
+        self._blocks = []
+        self._buffered = 0
+        self._offset = 0        # samples already transcribed
+        self._pending = []      # segments not yet chunked + embedded
+        self._stored = 0        # chunks embedded so far
+        self._stopping = False
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f"live-{meeting_id[:8]}",
+            daemon=True
+        )
+        self._thread.start()
+
+    # ===============================
+    # Called from the audio thread → keep it cheap
+    # ===============================
+    def feed(self, block):
+        # worker died → nothing will take the audio (the WAV spool still has it)
+        if self.error is not None:
+            return
+
+        with self._lock:
+            self._blocks.append(np.asarray(block, np.float32))
+            self._buffered += len(block)
+            full = self._buffered >= self.window
+
+        if full:
+            self._wake.set()
+
+    def finish(self):
+        """Process whatever is left and wait for it. Returns chunk count."""
+
+        self._stopping = True
+        self._wake.set()
+        self._thread.join()
+
+        if self.error is not None:
+            raise self.error
+
+        return self._stored
+
+    # ===============================
+    # Worker
+    # ===============================
+    def _run(self):
+        try:
+            while True:
+                self._wake.wait(timeout=1.0)
+                self._wake.clear()
+
+                final = self._stopping
+
+                if not final and self._buffered < self.window:
+                    continue
+
+                self._process(self._take(final), final)
+
+                if final:
+                    break
+
+        except Exception as e:
+            traceback.print_exc()
+            self.error = e
+
+            with self._lock:
+                self._blocks = []
+                self._buffered = 0
+
+        finally:
+            self.done = True
+
+    def _take(self, final):
+        with self._lock:
+            if not self._blocks:
+                return np.zeros(0, np.float32)
+
+            audio = np.concatenate(self._blocks)
+            self._blocks = []
+            self._buffered = 0
+
+        if final:
+            return audio
+
+        # cut at a pause near the end, keep the rest for the next pass
+        cut = last_pause(audio, SAMPLE_RATE, search_seconds=self.window * 0.3 / SAMPLE_RATE)
+        rest = audio[cut:]
+
+        if len(rest):
+            with self._lock:
+                self._blocks.insert(0, rest)
+                self._buffered += len(rest)
+
+        return audio[:cut]
+
+    def _process(self, audio, final):
+        offset = self._offset / SAMPLE_RATE
+        self._offset += len(audio)
+
+        if len(audio) and has_speech(audio, SAMPLE_RATE):
+            new = transcribe(audio)
+            for seg in new:
+                seg["start"] += offset
+                seg["end"] += offset
+
+            with self._lock:
+                self.segments.extend(new)
+            self._pending.extend(new)
+
+        self._store(final)
+
+    def _store(self, final):
+        """
+        Embed finished chunks. The last chunk may still grow with the
+        next window, so it waits unless this is the final pass.
+        """
+
+        if not self._pending:
+            return
+
+        chunks = split_segments(self._pending)
+
+        if final:
+            ready, self._pending = chunks, []
+        elif len(chunks) > 1 and chunks[-1].start is not None:
+            keep = [s for s in self._pending if s["start"] >= chunks[-1].start]
+
+            if len(keep) == len(self._pending):
+                # one long segment → holding it back would re-embed it next time
+                ready, self._pending = chunks, []
+            else:
+                ready, self._pending = chunks[:-1], keep
+        else:
+            return
+
+        embed_store(ready, self.meeting_id, start_index=self._stored)
+        self._stored += len(ready)
+
+        # answers given so far may miss what was just said
+        answer_cache.invalidate(self.meeting_id)
+
+
+# ===============================
+# Session registry
+# ===============================
+def start_live(meeting_id: str) -> LiveSession:
+    session = LiveSession(meeting_id)
+
+    with _sessions_lock:
+        _sessions[meeting_id] = session
+
+    return session
+
+
+def get_live(meeting_id: str):
+    with _sessions_lock:
+        return _sessions.get(meeting_id)
+
+
+def finish_live(meeting_id: str):
+    """Flush the last window, then forget the session."""
+
+    session = get_live(meeting_id)
+    if session is None:
+        return 0
+
+    try:
+        return session.finish()
+    finally:
+        with _sessions_lock:
+            _sessions.pop(meeting_id, None)
@@ -0,0 +1,572 @@
+# src/llm_gateway.py
+
+import asyncio
+import hashlib
+import heapq
+import itertools
+import json
+import os
+import queue
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Iterator, List, Optional
+
+import httpx
+from dotenv import load_dotenv
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+load_dotenv()
+
+# any OpenAI-compatible endpoint (a local fake server for load tests)
+LLM_BASE_URL = os.getenv("LLM_BASE_URL", "https://api.groq.com/openai/v1")
+LLM_API_KEY = os.getenv("LLM_API_KEY") or os.getenv("GROQ_API_KEY", "")
+LLM_MODEL = os.getenv("LLM_MODEL", "openai/gpt-oss-120b")
+
+# LLM_GATEWAY=0 → plain ChatGroq per caller (old behaviour)
+ENABLED = os.getenv("LLM_GATEWAY", "1") != "0"
+
+# token bucket: sustained requests/second + burst size
+# LLM_RATE=0 → no client-side limit (default); the provider's 429 +
+# Retry-After pauses every caller instead. Groq's free tier: LLM_RATE=0.5
+LLM_RATE = float(os.getenv("LLM_RATE", "0"))
+LLM_BURST = int(os.getenv("LLM_BURST", "5"))
+
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+LLM_BACKOFF = float(os.getenv("LLM_BACKOFF", "1.0"))          # first retry, seconds
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "30"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "120"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+
+RETRY_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+# lower goes first when calls have to wait for the limiter
+INTERACTIVE = 0     # chat, /notes the user is waiting on
+BACKGROUND = 1      # notes precomputed after ingest
+
+_priority = threading.local()
+
+
+def current_priority() -> int:
+    return getattr(_priority, "value", INTERACTIVE)
+
+
+@contextmanager
+def priority(level: int):
+    """LLM calls made by this thread inside the block wait at this level."""
+
+    previous = current_priority()
+    _priority.value = level
+    try:
+        yield
+    finally:
+        _priority.value = previous
+
+
+class RetryableError(Exception):
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """
+    rate tokens/second, at most burst saved up (rate 0 → unlimited).
+    acquire(level) waits for one; waiting calls are served lowest level
+    first, then in arrival order. pause() holds every call back (the
+    provider answered 429 with Retry-After).
+
+    Lives on the gateway loop.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._waiters = []                  # heap of (level, seq, future)
+        self._seq = itertools.count()
+        self._wakeup = None
+
+    def _refill(self, now):
+        if self.rate:
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _take(self):
+        now = time.monotonic()
+        if now < self._paused_until:
+            return False
+
+        if not self.rate:
+            return True
+
+        self._refill(now)
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+    def _delay(self):
+        now = time.monotonic()
+        delay = self._paused_until - now
+
+        if self.rate:
+            self._refill(now)
+            delay = max(delay, (1 - self._tokens) / self.rate)
+
+        return max(0.0, delay)
+
+    def _schedule(self):
+        if self._wakeup is None and self._waiters:
+            self._wakeup = asyncio.get_running_loop().call_later(self._delay(), self._release)
+
+    def _release(self):
+        self._wakeup = None
+
+        while self._waiters:
+            future = self._waiters[0][2]
+            if future.done():               # waiter was cancelled
+                heapq.heappop(self._waiters)
+                continue
+            if not self._take():
+                break
+            heapq.heappop(self._waiters)
+            future.set_result(None)
+
+        self._schedule()
+
+    async def acquire(self, level=INTERACTIVE):
+        if not self._waiters and self._take():
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (level, next(self._seq), future))
+        self._schedule()
+
+        await future
+
+    def pause(self, seconds):
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+class Metrics:
+    """Per-call latency / token counters, reported by stats()."""
+
+    def __init__(self, window=500):
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window)
+        self._first_token = deque(maxlen=window)
+        self.counts = {
+            "calls": 0, "streams": 0, "errors": 0,
+            "retries": 0, "coalesced": 0,
+            "prompt_tokens": 0, "completion_tokens": 0,
+        }
+
+    def add(self, name, n=1):
+        with self._lock:
+            self.counts[name] += n
+
+    def call(self, latency, usage=None, first_token=None):
+        with self._lock:
+            self._latencies.append(latency)
+            if first_token is not None:
+                self._first_token.append(first_token)
+            for key in ("prompt_tokens", "completion_tokens"):
+                self.counts[key] += (usage or {}).get(key, 0) or 0
+
+    @staticmethod
+    def _pct(values, p):
+        if not values:
+            return None
+        values = sorted(values)
+        return round(values[min(len(values) - 1, int(p * len(values)))], 3)
+
+    def stats(self):
+        with self._lock:
+            return {
+                **self.counts,
+                "latency_p50": self._pct(self._latencies, 0.5),
+                "latency_p95": self._pct(self._latencies, 0.95),
+                "first_token_p50": self._pct(self._first_token, 0.5),
+            }
+
+
+class LLMGateway:
+    """
+    One shared async client for every LLM call in the app.
+
+    Runs its own event loop on a daemon thread so sync callers (chain
+    code in the threadpool) and async callers share the same pooled
+    httpx connections, rate limiter and in-flight table:
+
+    - token bucket (off unless LLM_RATE is set); interactive calls
+      are let through ahead of background ones
+    - jittered exponential backoff on 429 / 5xx / network errors;
+      a Retry-After pauses every call, not just the one that got it
+    - identical non-streaming requests in flight share one call
+    """
+
+    def __init__(self, base_url=LLM_BASE_URL, api_key=LLM_API_KEY,
+                 rate=LLM_RATE, burst=LLM_BURST, transport=None):
+        if not api_key:
+            raise RuntimeError(
+                "No LLM API key: set LLM_API_KEY (or GROQ_API_KEY) in the environment or .env"
+            )
+
+        self.base_url = base_url
+        self.api_key = api_key
+        self.metrics = Metrics()
+
+        self._inflight = {}
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="llm-gateway", daemon=True
+        )
+        self._thread.start()
+
+        # created on the gateway loop → bound to it
+        self._bucket, self._client = self._call(self._setup(rate, burst, transport))
+
+    async def _setup(self, rate, burst, transport):
+        client = httpx.AsyncClient(
+            base_url=self.base_url,
+            transport=transport,
+            headers={"Authorization": f"Bearer {self.api_key}"},
+            timeout=LLM_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=LLM_MAX_CONNECTIONS
+            )
+        )
+        return TokenBucket(rate, burst), client
+
+    # ===============================
+    # Loop bridging
+    # ===============================
+    def _call(self, coro):
+        """Run a coroutine on the gateway loop from any thread; block for it."""
+
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    async def _acall(self, coro):
+        """Same, awaited from another event loop (e.g. FastAPI's)."""
+
+        return await asyncio.wrap_future(
+            asyncio.run_coroutine_threadsafe(coro, self._loop)
+        )
+
+    # ===============================
+    # Requests
+    # ===============================
+    async def _backoff(self, attempt, error):
+        self.metrics.add("retries")
+
+        delay = min(LLM_BACKOFF_MAX, LLM_BACKOFF * 2 ** attempt)
+        delay = random.uniform(0, delay)     # full jitter
+
+        if error.retry_after is not None:
+            delay = max(delay, error.retry_after)
+            self._bucket.pause(error.retry_after)
+
+        print(f"⚠️ LLM call failed ({error}), retry {attempt + 1} in {delay:.1f}s")
+        await asyncio.sleep(delay)
+
+    @staticmethod
+    def _check(response):
+        if response.status_code in RETRY_STATUS:
+            retry_after = response.headers.get("retry-after")
+            try:
+                retry_after = float(retry_after) if retry_after else None
+            except ValueError:
+                retry_after = None
+            raise RetryableError(f"HTTP {response.status_code}", retry_after)
+
+        response.raise_for_status()
+
+    async def _post(self, payload, level):
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            await self._bucket.acquire(level)
+            try:
+                response = await self._client.post("/chat/completions", json=payload)
+                self._check(response)
+                return response.json()
+
+            except (RetryableError, httpx.TransportError) as e:
+                if attempt == LLM_MAX_RETRIES:
+                    raise
+                if not isinstance(e, RetryableError):
+                    e = RetryableError(repr(e))
+                await self._backoff(attempt, e)
+
+    async def _complete(self, payload, level):
+        start = time.perf_counter()
+        self.metrics.add("calls")
+
+        try:
+            data = await self._post(payload, level)
+        except Exception:
+            self.metrics.add("errors")
+            raise
+
+        usage = data.get("usage") or {}
+        self.metrics.call(time.perf_counter() - start, usage)
+
+        return {
+            "content": data["choices"][0]["message"].get("content") or "",
+            "usage": usage,
+        }
+
+    async def complete(self, messages, model=LLM_MODEL, level=INTERACTIVE, **params):
+        """{"content", "usage"} for one chat completion (coalesced)."""
+
+        payload = {"model": model, "messages": messages, **params}
+        key = hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.metrics.add("coalesced")
+        else:
+            task = asyncio.ensure_future(self._complete(payload, level))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        # shield → one waiter giving up doesn't cancel the others
+        return await asyncio.shield(task)
+
+    async def stream(self, messages, model=LLM_MODEL, level=INTERACTIVE, **params):
+        """
+        Yields content pieces. Retries only until the first piece has
+        been produced; after that an error is raised to the caller.
+        """
+
+        payload = {"model": model, "messages": messages, "stream": True, **params}
+        start = time.perf_counter()
+        first = None
+        usage = {}
+        self.metrics.add("streams")
+
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            await self._bucket.acquire(level)
+            try:
+                async with self._client.stream("POST", "/chat/completions", json=payload) as response:
+                    self._check(response)
+
+                    async for line in response.aiter_lines():
+                        if not line.startswith("data: "):
+                            continue
+                        data = line[6:].strip()
+                        if data == "[DONE]":
+                            break
+
+                        event = json.loads(data)
+                        usage = event.get("usage") or (event.get("x_groq") or {}).get("usage") or usage
+
+                        for choice in event.get("choices", []):
+                            piece = (choice.get("delta") or {}).get("content")
+                            if piece:
+                                if first is None:
+                                    first = time.perf_counter() - start
+                                yield piece
+                break
+
+            except (RetryableError, httpx.TransportError) as e:
+                if first is not None or attempt == LLM_MAX_RETRIES:
+                    self.metrics.add("errors")
+                    raise
+                if not isinstance(e, RetryableError):
+                    e = RetryableError(repr(e))
+                await self._backoff(attempt, e)
+
+        self.metrics.call(time.perf_counter() - start, usage, first)
+
+    # ===============================
+    # Entry points from other threads / event loops
+    # ===============================
+    # the calling thread's priority() level is read here, before the hop
+    # onto the gateway loop
+    def complete_sync(self, messages, **params):
+        return self._call(self.complete(messages, level=current_priority(), **params))
+
+    async def acomplete(self, messages, **params):
+        """complete() awaited from another loop (FastAPI's) → no thread waits on the network."""
+
+        return await self._acall(self.complete(messages, level=current_priority(), **params))
+
+    async def astream(self, messages, **params) -> AsyncIterator[str]:
+        """Pieces from stream(), handed to the caller's loop as they arrive."""
+
+        loop = asyncio.get_running_loop()
+        out = asyncio.Queue()
+        done = object()
+        level = current_priority()
+
+        def hand_over(item):
+            loop.call_soon_threadsafe(out.put_nowait, item)
+
+        async def pump():
+            try:
+                async for piece in self.stream(messages, level=level, **params):
+                    hand_over(piece)
+                hand_over(done)
+            except BaseException as e:
+                hand_over(e)
+
+        future = asyncio.run_coroutine_threadsafe(pump(), self._loop)
+
+        try:
+            while True:
+                item = await out.get()
+                if item is done:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            future.cancel()     # caller stopped early (client went away)
+
+    def stream_sync(self, messages, **params) -> Iterator[str]:
+        """Pieces from stream(), handed over through a queue."""
+
+        out = queue.Queue()
+        done = object()
+        level = current_priority()
+
+        async def pump():
+            try:
+                async for piece in self.stream(messages, level=level, **params):
+                    out.put(piece)
+                out.put(done)
+            except BaseException as e:
+                out.put(e)
+
+        future = asyncio.run_coroutine_threadsafe(pump(), self._loop)
+
+        try:
+            while True:
+                item = out.get()
+                if item is done:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            future.cancel()     # caller stopped early (client went away)
+
+    def stats(self):
+        return {
+            **self.metrics.stats(),
+            "in_flight": len(self._inflight),
+            "base_url": self.base_url,
+        }
+
+    def close(self):
+        if self._loop.is_running():
+            self._call(self._client.aclose())
+            self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def get_gateway() -> LLMGateway:
+    global _gateway
+
+    with _gateway_lock:
+        if _gateway is None:
+            _gateway = LLMGateway()
+        return _gateway
+
+
+def gateway_stats():
+    return get_gateway().stats() if _gateway is not None else {}
+
+
+def close_gateway():
+    global _gateway
+
+    with _gateway_lock:
+        if _gateway is not None:
+            _gateway.close()
+            _gateway = None
+
+
+# ===============================
+# LangChain adapter
+# ===============================
+ROLES = {"human": "user", "ai": "assistant", "system": "system"}
+
+
+def _to_openai(messages: List[BaseMessage]):
+    return [
+        {"role": ROLES.get(m.type, "user"), "content": m.content}
+        for m in messages
+    ]
+
+
+class GatewayChatModel(BaseChatModel):
+    """Chat model for chains/prompts; every call goes through the shared gateway."""
+
+    model_name: str = LLM_MODEL
+    temperature: float = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "llm-gateway"
+
+    def _params(self, stop):
+        params = {"model": self.model_name, "temperature": self.temperature}
+        if stop:
+            params["stop"] = stop
+        return params
+
+    def _generate(self, messages, stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs) -> ChatResult:
+        result = get_gateway().complete_sync(_to_openai(messages), **self._params(stop))
+
+        return ChatResult(
+            generations=[ChatGeneration(message=AIMessage(content=result["content"]))],
+            llm_output={"token_usage": result["usage"], "model_name": self.model_name}
+        )
+
+    async def _agenerate(self, messages, stop: Optional[List[str]] = None,
+                         run_manager: Any = None, **kwargs) -> ChatResult:
+        result = await get_gateway().acomplete(_to_openai(messages), **self._params(stop))
+
+        return ChatResult(
+            generations=[ChatGeneration(message=AIMessage(content=result["content"]))],
+            llm_output={"token_usage": result["usage"], "model_name": self.model_name}
+        )
+
+    def _stream(self, messages, stop: Optional[List[str]] = None,
+                run_manager: Any = None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        for piece in get_gateway().stream_sync(_to_openai(messages), **self._params(stop)):
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=piece))
+            if run_manager is not None:
+                run_manager.on_llm_new_token(piece, chunk=chunk)
+            yield chunk
+
+    async def _astream(self, messages, stop: Optional[List[str]] = None,
+                       run_manager: Any = None, **kwargs) -> AsyncIterator[ChatGenerationChunk]:
+        async for piece in get_gateway().astream(_to_openai(messages), **self._params(stop)):
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=piece))
+            if run_manager is not None:
+                await run_manager.on_llm_new_token(piece, chunk=chunk)
+            yield chunk
+
+
+def get_llm(model_name: str = LLM_MODEL, temperature: float = 0):
+    """The app's chat model: gateway-backed, or ChatGroq with LLM_GATEWAY=0."""
+
+    if ENABLED:
+        return GatewayChatModel(model_name=model_name, temperature=temperature)
+
+    from langchain_groq import ChatGroq
+
+    return ChatGroq(model_name=model_name, temperature=temperature)
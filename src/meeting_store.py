@@ -0,0 +1,260 @@
+# src/meeting_store.py
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DB_PATH = os.getenv("MEETINGS_DB", os.path.join(BASE_DIR, "data", "meetings.db"))
+# old name mapping, imported once on first use
+LEGACY_FILE = os.path.join(BASE_DIR, "data", "meetings.json")
+
+SORT_COLUMNS = {"created_at", "name", "duration", "status"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meetings (
+    id          TEXT PRIMARY KEY,
+    name        TEXT,
+    created_at  REAL NOT NULL,
+    duration    REAL,
+    status      TEXT NOT NULL DEFAULT 'created',
+    artifacts   TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS meetings_created ON meetings (created_at);
+CREATE INDEX IF NOT EXISTS meetings_name ON meetings (name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS meetings_status ON meetings (status, created_at);
+
+CREATE TABLE IF NOT EXISTS store_meta (
+    key    TEXT PRIMARY KEY,
+    value  TEXT
+);
+"""
+
+_local = threading.local()
+_init_lock = threading.Lock()
+_ready = False
+
+
+def _connect():
+    conn = sqlite3.connect(DB_PATH, timeout=10, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+
+    # WAL → readers never block the writer; writers queue on busy_timeout
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=10000")
+    return conn
+
+
+def _db():
+    """One connection per thread (sqlite3 connections are not thread-safe)."""
+
+    global _ready
+
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+        conn = _local.conn = _connect()
+
+    if not _ready:
+        with _init_lock:
+            if not _ready:
+                conn.executescript(SCHEMA)
+                _import_legacy(conn)
+                _ready = True
+
+    return conn
+
+
+def _import_legacy(conn):
+    """One-time copy of data/meetings.json (id → name) into the table."""
+
+    done = conn.execute(
+        "SELECT value FROM store_meta WHERE key = 'legacy_imported'"
+    ).fetchone()
+
+    if done or not os.path.exists(LEGACY_FILE):
+        return
+
+    with open(LEGACY_FILE) as f:
+        names = json.load(f)
+
+    # the file kept insertion order (oldest first) → keep it in created_at
+    base = os.path.getmtime(LEGACY_FILE) - len(names)
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.executemany(
+            "INSERT OR IGNORE INTO meetings (id, name, created_at, status) "
+            "VALUES (?, ?, ?, 'done')",
+            [(mid, name, base + i) for i, (mid, name) in enumerate(names.items())]
+        )
+        conn.execute(
+            "INSERT INTO store_meta (key, value) VALUES ('legacy_imported', ?)",
+            (str(time.time()),)
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+    print(f"📥 Imported {len(names)} meetings from {LEGACY_FILE}")
+
+
+def _row(row):
+    if row is None:
+        return None
+
+    meeting = dict(row)
+    meeting["artifacts"] = json.loads(meeting["artifacts"] or "{}")
+    return meeting
+
+
+# ===============================
+# Writes
+# ===============================
+def create(meeting_id: str, status: str = "created", **artifacts):
+    _db().execute(
+        "INSERT OR IGNORE INTO meetings (id, created_at, status, artifacts) "
+        "VALUES (?, ?, ?, ?)",
+        (meeting_id, time.time(), status, json.dumps(artifacts))
+    )
+
+
+def update(meeting_id: str, **fields):
+    """Set name / duration / status; creates the row if it is missing."""
+
+    fields = {k: v for k, v in fields.items() if k in ("name", "duration", "status")}
+    if not fields:
+        return
+
+    columns = ", ".join(fields)
+    placeholders = ", ".join("?" for _ in fields)
+    updates = ", ".join(f"{k} = excluded.{k}" for k in fields)
+
+    _db().execute(
+        f"INSERT INTO meetings (id, created_at, {columns}) VALUES (?, ?, {placeholders}) "
+        f"ON CONFLICT(id) DO UPDATE SET {updates}",
+        (meeting_id, time.time(), *fields.values())
+    )
+
+
+def set_name(meeting_id: str, name: str):
+    update(meeting_id, name=name)
+
+
+def add_artifact(meeting_id: str, kind: str, path: str):
+    conn = _db()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        row = conn.execute(
+            "SELECT artifacts FROM meetings WHERE id = ?", (meeting_id,)
+        ).fetchone()
+
+        artifacts = json.loads(row["artifacts"]) if row else {}
+        artifacts[kind] = path
+
+        conn.execute(
+            "INSERT INTO meetings (id, created_at, artifacts) VALUES (?, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET artifacts = excluded.artifacts",
+            (meeting_id, time.time(), json.dumps(artifacts))
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def fail_unfinished(keep=()):
+    """
+    Meetings a previous run left at recording / queued / processing →
+    failed, except those in keep (jobs still queued). Returns the count.
+    """
+
+    keep = list(keep)
+    exclude = f"AND id NOT IN ({', '.join('?' for _ in keep)})" if keep else ""
+
+    return _db().execute(
+        "UPDATE meetings SET status = 'failed' "
+        f"WHERE status IN ('recording', 'queued', 'processing') {exclude}",
+        keep
+    ).rowcount
+
+
+# ===============================
+# Reads
+# ===============================
+def get(meeting_id: str):
+    return _row(_db().execute(
+        "SELECT * FROM meetings WHERE id = ?", (meeting_id,)
+    ).fetchone())
+
+
+def get_name(meeting_id: str):
+    row = _db().execute(
+        "SELECT name FROM meetings WHERE id = ?", (meeting_id,)
+    ).fetchone()
+    return row["name"] if row and row["name"] else None
+
+
+def names():
+    """{meeting_id: name} of every named meeting."""
+
+    return {
+        row["id"]: row["name"]
+        for row in _db().execute("SELECT id, name FROM meetings WHERE name IS NOT NULL")
+    }
+
+
+def ids_matching(text: str):
+    """Meeting ids whose name contains text (case-insensitive)."""
+
+    return {
+        row["id"]
+        for row in _db().execute(
+            "SELECT id FROM meetings WHERE name LIKE ? ESCAPE '\\'",
+            (_like(text),)
+        )
+    }
+
+
+def _like(text: str) -> str:
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def list_meetings(offset=0, limit=50, sort="-created_at", q=None):
+    """
+    (meetings, total) for one page.
+
+    sort: column name, "-" prefix for descending
+          (created_at | name | duration | status)
+    q:    substring of the name (case-insensitive)
+    """
+
+    column = sort.lstrip("-")
+    if column not in SORT_COLUMNS:
+        raise ValueError(f"Cannot sort by {column}")
+
+    direction = "DESC" if sort.startswith("-") else "ASC"
+    collate = " COLLATE NOCASE" if column == "name" else ""
+
+    where, params = "", []
+    if q:
+        where, params = "WHERE name LIKE ? ESCAPE '\\'", [_like(q)]
+
+    conn = _db()
+
+    total = conn.execute(f"SELECT COUNT(*) FROM meetings {where}", params).fetchone()[0]
+
+    rows = conn.execute(
+        f"SELECT * FROM meetings {where} "
+        f"ORDER BY {column}{collate} {direction}, id {direction} "
+        "LIMIT ? OFFSET ?",
+        [*params, limit, offset]
+    ).fetchall()
+
+    return [_row(r) for r in rows], total
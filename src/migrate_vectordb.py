@@ -0,0 +1,98 @@
+"""
+Copy per-meeting vector stores (data/vectordb/<meeting_id>/) into the
+shared collection used by VECTOR_STORE_MODE=shared.
+
+    python -m src.migrate_vectordb            # copy, keep old dirs
+    python -m src.migrate_vectordb --delete   # copy, then remove old dirs
+
+Safe to re-run: a meeting's chunks in the shared collection are
+replaced, not duplicated.
+"""
+
+import argparse
+import os
+import shutil
+
+import numpy as np
+
+from src.embed_store import (
+    COLLECTION_NAME,
+    SHARED_COLLECTION,
+    SHARED_DIR,
+    VECTORDB_DIR,
+    _client,
+    add_batched,
+    stored_embedding_model,
+)
+from src.embedding_models import EMBEDDING_MODEL, encode_chunks
+
+
+def migrate(delete=False):
+
+    shared_client = _client(SHARED_DIR)
+    shared = shared_client.get_or_create_collection(
+        SHARED_COLLECTION,
+        metadata={"embedding_model": EMBEDDING_MODEL}
+    )
+    target_model = stored_embedding_model(shared)
+
+    migrated = 0
+
+    for meeting_id in sorted(os.listdir(VECTORDB_DIR)):
+        path = os.path.join(VECTORDB_DIR, meeting_id)
+
+        if path == SHARED_DIR or not os.path.isdir(path):
+            continue
+
+        try:
+            collection = _client(path).get_collection(COLLECTION_NAME)
+        except Exception:
+            print(f"⚠️ Skipping {meeting_id}: no '{COLLECTION_NAME}' collection")
+            continue
+
+        data = collection.get(include=["documents", "metadatas", "embeddings"])
+        ids = data["ids"]
+
+        if not ids:
+            print(f"⚠️ Skipping {meeting_id}: empty")
+            continue
+
+        metadatas = []
+        for i, (chunk_id, meta) in enumerate(zip(ids, data["metadatas"])):
+            meta = dict(meta or {})
+            meta["meeting_id"] = meeting_id
+            meta.setdefault("chunk", int(chunk_id) if chunk_id.isdigit() else i)
+            metadatas.append(meta)
+
+        # vectors can be copied as-is only if they come from the same model
+        if stored_embedding_model(collection) == target_model:
+            embeddings = np.asarray(data["embeddings"], np.float32)
+        else:
+            embeddings = encode_chunks(data["documents"], target_model)
+
+        shared.delete(where={"meeting_id": meeting_id})
+
+        add_batched(
+            shared, shared_client,
+            [f"{meeting_id}:{chunk_id}" for chunk_id in ids],
+            data["documents"],
+            embeddings,
+            metadatas
+        )
+
+        print(f"✅ {meeting_id}: {len(ids)} chunks")
+        migrated += 1
+
+        if delete:
+            shutil.rmtree(path, ignore_errors=True)
+
+    print(f"Migrated {migrated} meetings into {SHARED_DIR}")
+    print("Set VECTOR_STORE_MODE=shared to use it.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrate per-meeting vector stores into one shared collection")
+    parser.add_argument("--delete", action="store_true", help="remove the per-meeting directories after copying")
+    args = parser.parse_args()
+
+    migrate(delete=args.delete)
@@ -0,0 +1,257 @@
+# src/numpy_index.py
+
+import json
+import os
+import threading
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.vectorstores import VectorStore
+
+VECTORS_FILE = "vectors.npy"     # (n, dim) float32, L2-normalised rows
+CHUNKS_FILE = "chunks.json"      # {"embedding_model", "documents", "metadatas"}
+
+
+def _normalise(vectors):
+    vectors = np.ascontiguousarray(vectors, np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _replace(path, write):
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def read_sidecar(directory):
+    with open(os.path.join(directory, CHUNKS_FILE), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_index(directory, documents, embeddings, metadatas, model_name, start_index=0):
+    """
+    Write (or append to, from start_index) a meeting's index:
+    a float32 matrix + a JSON sidecar with the chunk text and metadata.
+    """
+
+    os.makedirs(directory, exist_ok=True)
+
+    vectors = _normalise(embeddings)
+    vectors_path = os.path.join(directory, VECTORS_FILE)
+
+    if start_index and os.path.exists(vectors_path):
+        sidecar = read_sidecar(directory)
+        old = np.load(vectors_path)[:start_index]
+        vectors = np.vstack([old, vectors])
+        documents = sidecar["documents"][:start_index] + list(documents)
+        metadatas = sidecar["metadatas"][:start_index] + list(metadatas)
+
+    def save_vectors(path):
+        with open(path, "wb") as f:
+            np.save(f, vectors)
+
+    def save_sidecar(path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "embedding_model": model_name,
+                "documents": list(documents),
+                "metadatas": list(metadatas),
+            }, f)
+
+    # vectors first: a reader that sees the new sidecar always has its rows
+    _replace(vectors_path, save_vectors)
+    _replace(os.path.join(directory, CHUNKS_FILE), save_sidecar)
+
+
+def has_index(directory):
+    return os.path.exists(os.path.join(directory, CHUNKS_FILE))
+
+
+def _matches(meta, where):
+    """Subset of chroma's where syntax: equality, $in, $gte, $lte, $and."""
+
+    if not where:
+        return True
+
+    for key, cond in where.items():
+        if key == "$and":
+            if not all(_matches(meta, c) for c in cond):
+                return False
+            continue
+
+        value = meta.get(key)
+
+        if isinstance(cond, dict):
+            for op, arg in cond.items():
+                if op == "$in" and value not in arg:
+                    return False
+                if op == "$gte" and (value is None or value < arg):
+                    return False
+                if op == "$lte" and (value is None or value > arg):
+                    return False
+        elif value != cond:
+            return False
+
+    return True
+
+
+class NumpyIndex(VectorStore):
+    """
+    One meeting's chunks as a memory-mapped matrix. Top-k is a single
+    matrix-vector product plus argpartition; opening is one np.load
+    with mmap_mode and a small JSON read.
+
+    Reloads by itself when the files change (live transcription appends).
+    """
+
+    def __init__(self, directory, embedding):
+        self.directory = directory
+        self._embedding = embedding
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._load()
+
+    def _load(self):
+        vectors_path = os.path.join(self.directory, VECTORS_FILE)
+        sidecar_path = os.path.join(self.directory, CHUNKS_FILE)
+
+        mtime = os.stat(sidecar_path).st_mtime_ns
+        if mtime == self._mtime:
+            return
+
+        sidecar = read_sidecar(self.directory)
+        vectors = np.load(vectors_path, mmap_mode="r")
+
+        self.embedding_model = sidecar["embedding_model"]
+        self.documents = sidecar["documents"]
+        self.metadatas = sidecar["metadatas"]
+        self.vectors = vectors[:len(self.documents)]
+        self._mtime = mtime
+
+    @property
+    def embeddings(self):
+        return self._embedding
+
+    # ===============================
+    # Search
+    # ===============================
+    def similarity_search_by_vector_with_relevance_scores(self, embedding, k=4, filter=None, **kwargs):
+        """[(Document, distance)], distance = 1 - cosine similarity."""
+
+        with self._lock:
+            self._load()
+            vectors, documents, metadatas = self.vectors, self.documents, self.metadatas
+
+        if len(documents) == 0:
+            return []
+
+        query = _normalise(np.asarray(embedding, np.float32))
+        scores = vectors @ query
+
+        if filter:
+            mask = np.array([_matches(m, filter) for m in metadatas])
+            scores = np.where(mask, scores, -np.inf)
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        return [
+            (
+                Document(page_content=documents[i], metadata=metadatas[i]),
+                float(1.0 - scores[i])
+            )
+            for i in top
+            if np.isfinite(scores[i])
+        ]
+
+    def similarity_search_by_vectors(self, embeddings, k=4, filter=None):
+        """Top-k Documents for several query vectors in one matrix product."""
+
+        with self._lock:
+            self._load()
+            vectors, documents, metadatas = self.vectors, self.documents, self.metadatas
+
+        queries = np.asarray(embeddings, np.float32)
+        if len(documents) == 0:
+            return [[] for _ in queries]
+
+        scores = vectors @ _normalise(queries).T        # (n, queries)
+
+        if filter:
+            mask = np.array([_matches(m, filter) for m in metadatas])
+            scores[~mask] = -np.inf
+
+        k = min(k, len(documents))
+        top = np.argsort(-scores, axis=0)[:k].T
+
+        return [
+            [
+                Document(page_content=documents[i], metadata=metadatas[i])
+                for i in rows
+                if np.isfinite(scores[i, q])
+            ]
+            for q, rows in enumerate(top)
+        ]
+
+    def similarity_search_by_vector(self, embedding, k=4, filter=None, **kwargs):
+        return [
+            doc for doc, _ in
+            self.similarity_search_by_vector_with_relevance_scores(embedding, k, filter)
+        ]
+
+    def similarity_search_with_score(self, query, k=4, filter=None, **kwargs):
+        return self.similarity_search_by_vector_with_relevance_scores(
+            self._embedding.embed_query(query), k, filter
+        )
+
+    def similarity_search(self, query, k=4, filter=None, **kwargs):
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, filter)]
+
+    def _select_relevance_score_fn(self):
+        return lambda distance: 1.0 - distance
+
+    # ===============================
+    # Writes (VectorStore API) → write_index()
+    # ===============================
+    def add_texts(self, texts, metadatas=None, **kwargs):
+        """Embed and append texts; returns their row numbers as ids."""
+
+        texts = list(texts)
+        if not texts:
+            return []
+
+        metadatas = list(metadatas) if metadatas is not None else [{} for _ in texts]
+
+        with self._lock:
+            self._load()
+            start = len(self.documents)
+
+            write_index(
+                self.directory, texts,
+                self._embedding.embed_documents(texts),
+                metadatas, self.embedding_model, start_index=start
+            )
+            self._load()
+
+        return [str(i) for i in range(start, start + len(texts))]
+
+    @classmethod
+    def from_texts(cls, texts, embedding, metadatas=None, persist_directory=None,
+                   model_name=None, **kwargs):
+        """New index in persist_directory (replacing any there) holding texts."""
+
+        if persist_directory is None:
+            raise ValueError("NumpyIndex.from_texts needs persist_directory")
+
+        texts = list(texts)
+        metadatas = list(metadatas) if metadatas is not None else [{} for _ in texts]
+        model_name = model_name or getattr(embedding, "model_name", "unknown")
+
+        write_index(
+            persist_directory, texts, embedding.embed_documents(texts),
+            metadatas, model_name
+        )
+
+        return cls(persist_directory, embedding)
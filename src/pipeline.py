@@ -1,50 +1,158 @@
 # src/pipeline.py
 
-from langchain_classic.chains import TransformChain, SimpleSequentialChain
+import os
+from dataclasses import dataclass
+from typing import List
 
-from src.video_to_audio import video_to_audio
-from src.audio_to_text import audio_to_text
-from src.chunk_text import chunk_text
+import numpy as np
 
-
-# 1️⃣ Video → Audio
-video_chain = TransformChain(
-    input_variables=["video"],
-    output_variables=["audio"],
-    transform=lambda x: {"audio": video_to_audio(x["video"])}
+from src import transcript_cache
+from src.transcribe_backends import (
+    TRANSCRIBE_BACKEND,
+    WHISPER_COMPUTE_TYPE,
+    WHISPER_MODEL,
+)
+from src.video_to_audio import (
+    LOUDNORM,
+    SAMPLE_RATE,
+    WINDOW_SECONDS,
+    decode_audio,
+    iter_audio_windows,
+    video_to_audio,
 )
+from src.audio_to_text import (
+    TRANSCRIBE_WINDOW_SECONDS,
+    TRANSCRIBE_WORKERS,
+    transcribe,
+    transcribe_parallel,
+    transcribe_windows,
+    write_transcript,
+)
+from src.chunk_text import Chunk, split_segments, write_chunks
+from src.workspace import meeting_workspace
 
+# DECODE_MODE=buffer → ffmpeg PCM → one float32 buffer → Whisper (default)
+# DECODE_MODE=stream → ffmpeg PCM → bounded queue of windows → Whisper
+# DECODE_MODE=wav    → old path: clean WAV on disk, Whisper decodes it again
+DECODE_MODE = os.getenv("DECODE_MODE", "buffer")
 
-# 2️⃣ Audio → Text
-audio_chain = TransformChain(
-    input_variables=["audio"],
-    output_variables=["text"],
-    transform=lambda x: {"text": audio_to_text(x["audio"])}
-)
 
+@dataclass
+class PipelineResult:
+    segments: List[dict]   # Whisper segments with timestamps
+    chunks: List[Chunk]
+    duration: float        # seconds of audio
 
-# 3️⃣ Text → Chunks (LAST STEP)
-chunk_chain = TransformChain(
-    input_variables=["text"],
-    output_variables=["chunks"],
-    transform=lambda x: {"chunks": chunk_text(x["text"])}
-)
 
+def _transcribe_media(media_path, mode, loudnorm):
+    """media → (segments, duration) using the selected decode mode."""
 
-# NO embed_store here anymore
-pipeline = SimpleSequentialChain(
-    chains=[
-        video_chain,
-        audio_chain,
-        chunk_chain
-    ],
-    verbose=True
-)
+    if mode == "buffer":
+        audio: np.ndarray = decode_audio(media_path, loudnorm=loudnorm)
+        return transcribe_parallel(audio), len(audio) / SAMPLE_RATE
+
+    if mode == "stream":
+        total = [0]
+
+        def counted(windows):
+            for offset, window in windows:
+                total[0] += len(window)
+                yield offset, window
+
+        segments = transcribe_windows(
+            counted(iter_audio_windows(media_path, loudnorm=loudnorm))
+        )
+        return segments, total[0] / SAMPLE_RATE
+
+    if mode == "wav":
+        with meeting_workspace("wav") as workdir:
+            wav_path = video_to_audio(media_path, workdir, loudnorm=loudnorm)
+            segments = transcribe(wav_path)
+            duration = os.path.getsize(wav_path) / (SAMPLE_RATE * 2)
+        return segments, duration
+
+    raise ValueError(f"Unknown DECODE_MODE: {mode}")
+
+
+def _decode_settings(mode):
+    """
+    Settings of a decode mode that move segment boundaries (and so the
+    text Whisper writes) → part of the transcript cache key.
+    """
 
+    if mode == "buffer":
+        if TRANSCRIBE_WORKERS <= 1:
+            return {"decode_mode": mode, "workers": 1}
 
-def run_pipeline(video_path: str):
+        return {
+            "decode_mode": mode,
+            "workers": TRANSCRIBE_WORKERS,
+            "window_seconds": TRANSCRIBE_WINDOW_SECONDS,
+        }
+
+    if mode == "stream":
+        return {"decode_mode": mode, "window_seconds": WINDOW_SECONDS}
+
+    return {"decode_mode": mode}
+
+
+def run_pipeline(media_path: str, artifact_dir=None, on_stage=None,
+                 decode_mode=None, loudnorm=None) -> PipelineResult:
     """
-    Returns chunks file path only.
+    Media → audio → Whisper segments → chunks, in memory.
+
+    artifact_dir: if set, transcript.txt and chunks.txt are written there
+                  (debugging / keeping a copy).
+    on_stage:     optional callback(stage_name) called as each stage starts.
+    decode_mode:  overrides DECODE_MODE.
+    loudnorm:     "single" or "off", overrides LOUDNORM.
+
     Embedding handled in services.py
     """
-    return pipeline.run(video_path)
+
+    def stage(name):
+        print(f"▶ {name}")
+        if on_stage is not None:
+            on_stage(name)
+
+    mode = decode_mode or DECODE_MODE
+    loudnorm = loudnorm or LOUDNORM
+
+    # same audio + same settings → reuse the transcript, skip decode + Whisper
+    key = None
+    cached = None
+
+    if transcript_cache.ENABLED:
+        key = transcript_cache.cache_key(
+            media_path,
+            backend=TRANSCRIBE_BACKEND,
+            model=WHISPER_MODEL,
+            compute_type=WHISPER_COMPUTE_TYPE,
+            task="translate",
+            loudnorm=loudnorm,
+            **_decode_settings(mode)
+        )
+        cached = transcript_cache.get(key)
+
+    # 1️⃣ + 2️⃣ Media → Audio → Segments
+    # (in stream mode decoding and transcription overlap)
+    stage("transcribing")
+
+    if cached is not None:
+        print("⚡ Transcript cache hit")
+        segments, duration = cached["segments"], cached["duration"]
+    else:
+        segments, duration = _transcribe_media(media_path, mode, loudnorm)
+        if key is not None:
+            transcript_cache.put(key, segments, duration)
+
+    # 3️⃣ Segments → Chunks (LAST STEP)
+    stage("chunking")
+    chunks = split_segments(segments)
+
+    if artifact_dir is not None:
+        os.makedirs(artifact_dir, exist_ok=True)
+        write_transcript(segments, os.path.join(artifact_dir, "transcript.txt"))
+        write_chunks(chunks, os.path.join(artifact_dir, "chunks.txt"))
+
+    return PipelineResult(segments, chunks, duration)
@@ -1,6 +1,10 @@
 # src/recorder.py
 
-import sounddevice as sd
+import os
+import threading
+from datetime import datetime
+from uuid import uuid4
+
 import numpy as np
 import soundfile as sf
 
@@ -8,53 +12,288 @@ FS = 16000
 DEVICE_ID = 1      #  Stereo Mix (Realtek)
 CHANNELS = 2       # stereo
 
-recording = []
-is_recording = False
+# RECORDER_DEVICE=fake → synthetic input, no sound card needed (testing)
+DEFAULT_DEVICE = os.getenv("RECORDER_DEVICE", DEVICE_ID)
+
+# ring buffer between the audio callback and the disk writer
+RING_SECONDS = 30
+# how often the writer drains the ring
+FLUSH_INTERVAL = 0.5
+
+
+class AudioSpool:
+    """
+    Fixed-size ring buffer drained to a WAV file by a writer thread.
+
+    The audio callback only downmixes and copies into preallocated
+    memory; all disk I/O happens on the writer thread. Memory stays at
+    RING_SECONDS of mono audio however long the meeting runs.
+    """
+
+    def __init__(self, filename, samplerate=FS, ring_seconds=RING_SECONDS):
+        self.filename = filename
+        self.frames_written = 0
+        self.frames_dropped = 0
+
+        self._ring = np.zeros(int(ring_seconds * samplerate), np.float32)
+        self._head = 0      # total frames put into the ring
+        self._tail = 0      # total frames written to disk
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+        self._file = sf.SoundFile(
+            filename, mode="w",
+            samplerate=samplerate, channels=1, subtype="PCM_16"
+        )
+
+        self._thread = threading.Thread(target=self._writer, daemon=True)
+        self._thread.start()
+
+    # audio thread
+    def put(self, mono):
+        size = len(self._ring)
+        n = len(mono)
+
+        with self._lock:
+            if self._head + n - self._tail > size:
+                # writer fell a full ring behind → drop rather than block audio
+                self.frames_dropped += n
+                return
+
+            start = self._head % size
+            first = min(n, size - start)
+            self._ring[start:start + first] = mono[:first]
+            self._ring[:n - first] = mono[first:]
+            self._head += n
+
+    # writer thread
+    def _drain(self):
+        size = len(self._ring)
+
+        with self._lock:
+            head = self._head
+
+        while self._tail < head:
+            start = self._tail % size
+            n = min(head - self._tail, size - start)
+
+            self._file.write(self._ring[start:start + n])
+
+            with self._lock:
+                self._tail += n
+            self.frames_written += n
+
+    def _writer(self):
+        while not self._stop.wait(FLUSH_INTERVAL):
+            self._drain()
+        self._drain()
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+        self._file.close()
+
+        if self.frames_dropped:
+            print(f"⚠️ Dropped {self.frames_dropped} frames (disk too slow)")
+
+
+class FakeInputStream:
+    """
+    Stand-in for sounddevice.InputStream: a thread calls the callback
+    with a quiet 440 Hz tone in real time. Same start/stop/close API.
+    """
+
+    def __init__(self, samplerate, channels, callback, blocksize=1600, **_):
+        self.samplerate = samplerate
+        self.channels = channels
+        self.callback = callback
+        self.blocksize = blocksize
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        n = 0
+        interval = self.blocksize / self.samplerate
+
+        while not self._stop.wait(interval):
+            t = (np.arange(n, n + self.blocksize) / self.samplerate).astype(np.float32)
+            tone = 0.1 * np.sin(2 * np.pi * 440 * t)
+            self.callback(np.repeat(tone[:, None], self.channels, axis=1), self.blocksize, None, None)
+            n += self.blocksize
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
 
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
 
-# Callback
-def _callback(indata, frames, time, status):
-    if is_recording:
-        recording.append(indata.copy())
+    def close(self):
+        pass
 
 
-# Start recording
-def start_recording():
-    global recording, is_recording
+def _open_stream(device, channels, callback):
+    if device == "fake":
+        return FakeInputStream(samplerate=FS, channels=channels, callback=callback)
 
-    recording = []
-    is_recording = True
+    # imported here so the fake device works without PortAudio installed
+    import sounddevice as sd
 
-    stream = sd.InputStream(
+    return sd.InputStream(
         samplerate=FS,
-        channels=CHANNELS,
-        device=DEVICE_ID,
-        callback=_callback
+        channels=channels,
+        device=device,
+        callback=callback
     )
 
-    stream.start()
-    print("🎧 Recording SYSTEM AUDIO  (Stereo Mix)...")
 
-    return stream
+class RecordingSession:
+    """One capture stream with its own spool file and device."""
 
+    def __init__(self, session_id, filename, device, channels, listener=None, **info):
+        self.session_id = session_id
+        self.filename = filename
+        self.device = device
+        self.channels = channels
+        self.info = info
+        self.started_at = datetime.now().isoformat(timespec="seconds")
 
-# Stop recording
-def stop_recording(stream, filename="uploads/meeting.wav"):
-    global is_recording
+        # optional listener for live transcription → gets mono float32 blocks
+        self._listener = listener
+        self._active = False
+        self._stream = _open_stream(device, channels, self._callback)
 
-    is_recording = False
+        try:
+            self._spool = AudioSpool(filename)
+        except Exception:
+            self._stream.close()
+            raise
 
-    stream.stop()
-    stream.close()
+    # Callback
+    def _callback(self, indata, frames, time, status):
+        if self._active:
+            mono = indata.mean(axis=1, dtype=np.float32)
 
-    if len(recording) == 0:
-        print("⚠️ No audio captured")
+            self._spool.put(mono)
+
+            # read once: stop() clears it from another thread
+            listener = self._listener
+            if listener is not None:
+                listener(mono)
+
+    def start(self):
+        self._active = True
+        self._stream.start()
+        print(f"🎧 Recording session {self.session_id} (device {self.device})...")
+
+    def abort(self):
+        """start() failed → release the device, writer thread and WAV file."""
+
+        self._active = False
+        self._listener = None
+
+        try:
+            self._stream.stop()
+            self._stream.close()
+        except Exception:
+            pass
+
+        self._spool.close()
+
+    def stop(self):
+        """Stop capture and close the file. Returns its path or None if empty."""
+
+        self._active = False
+        self._listener = None
+
+        self._stream.stop()
+        self._stream.close()
+        self._spool.close()
+
+        if self._spool.frames_written == 0:
+            print("⚠️ No audio captured")
+            return None
+
+        print(f"✅ Saved to {self.filename}")
+
+        return self.filename
+
+    def to_dict(self):
+        return {
+            "session_id": self.session_id,
+            "device": self.device,
+            "started_at": self.started_at,
+            "seconds": round(self._spool.frames_written / FS, 1),
+            **self.info,
+        }
+
+
+class RecordingManager:
+    """Independent recording sessions keyed by session ID."""
+
+    def __init__(self):
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def start(self, filename, device=None, channels=None, listener=None, **info):
+        device = DEFAULT_DEVICE if device is None else device
+        if isinstance(device, str) and device.isdigit():
+            device = int(device)
+
+        session = RecordingSession(
+            uuid4().hex,
+            filename,
+            device,
+            channels or CHANNELS,
+            listener,
+            **info
+        )
+
+        try:
+            session.start()
+        except Exception:
+            session.abort()
+            raise
+
+        with self._lock:
+            self._sessions[session.session_id] = session
+
+        return session
+
+    def get(self, session_id):
+        with self._lock:
+            return self._sessions.get(session_id)
+
+    def only(self):
+        """The single running session, or None if there are 0 or several."""
+
+        with self._lock:
+            if len(self._sessions) == 1:
+                return next(iter(self._sessions.values()))
         return None
 
-    audio = np.concatenate(recording, axis=0)
+    def stop(self, session_id):
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+
+        if session is None:
+            raise KeyError(session_id)
+
+        return session.stop()
 
-    sf.write(filename, audio, FS)
+    def list(self):
+        with self._lock:
+            return [s.to_dict() for s in self._sessions.values()]
 
-    print(f"✅ Saved to {filename}")
+    def stop_all(self):
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
 
-    return filename
+        for session in sessions:
+            try:
+                session.stop()
+            except Exception:
+                pass
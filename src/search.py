@@ -0,0 +1,129 @@
+# src/search.py
+
+import heapq
+import os
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from src.embed_store import list_meeting_ids, shared_mode
+from src.embedding_models import get_embeddings
+from src import meeting_store, vectorstore
+
+# per-meeting stores are queried in parallel
+SEARCH_WORKERS = int(os.getenv("SEARCH_WORKERS", "8"))
+
+_executor = ThreadPoolExecutor(max_workers=SEARCH_WORKERS, thread_name_prefix="search")
+
+
+def _where(meeting_ids, date_from, date_to):
+    """Chroma metadata filter for the optional restrictions."""
+
+    clauses = []
+
+    if meeting_ids is not None:
+        clauses.append({"meeting_id": {"$in": list(meeting_ids)}})
+    if date_from is not None:
+        clauses.append({"ingested_at": {"$gte": date_from}})
+    if date_to is not None:
+        clauses.append({"ingested_at": {"$lte": date_to}})
+
+    if not clauses:
+        return None
+    if len(clauses) == 1:
+        return clauses[0]
+    return {"$and": clauses}
+
+
+def _query_store(meeting_id, vector, k, where):
+    """[(meeting_id, doc, distance)] from one store (meeting_id None → shared)."""
+
+    try:
+        if meeting_id is None:
+            db = vectorstore.get_shared_store()
+            hits = db.similarity_search_by_vector_with_relevance_scores(
+                vector, k=k, filter=where
+            )
+        else:
+            with vectorstore.search_handle(meeting_id) as db:
+                if db is None:
+                    return []
+
+                hits = db.similarity_search_by_vector_with_relevance_scores(
+                    vector, k=k, filter=where
+                )
+    except Exception:
+        traceback.print_exc()
+        return []
+
+    # older per-meeting stores don't have meeting_id in chunk metadata
+    return [
+        ((doc.metadata or {}).get("meeting_id", meeting_id), doc, distance)
+        for doc, distance in hits
+    ]
+
+
+def search_meetings(query, k=10, meeting_ids=None, name=None,
+                    date_from=None, date_to=None):
+    """
+    One query across every stored meeting (or a filtered set).
+
+    meeting_ids:        only these meetings
+    name:               only meetings whose name contains this (case-insensitive)
+    date_from/date_to:  epoch seconds, compared with the chunk's ingest time
+                        (meetings stored before ingest times were recorded
+                        are left out when a date filter is set)
+
+    Returns the k closest chunks overall, best first.
+    """
+
+    names = meeting_store.names()
+
+    if name:
+        matching = meeting_store.ids_matching(name)
+        meeting_ids = matching if meeting_ids is None else set(meeting_ids) & matching
+
+    if meeting_ids is not None and not meeting_ids:
+        return []
+
+    # embed once, reuse for every store
+    vector = get_embeddings().embed_query(query)
+
+    if shared_mode():
+        hits = _query_store(
+            None, vector, k, _where(meeting_ids, date_from, date_to)
+        )
+    else:
+        candidates = list_meeting_ids()
+        if meeting_ids is not None:
+            candidates = [m for m in candidates if m in meeting_ids]
+
+        where = _where(None, date_from, date_to)
+
+        # each store returns its own top-k; a k-sized heap keeps the overall best
+        hits = heapq.nsmallest(
+            k,
+            (
+                hit
+                for store_hits in _executor.map(
+                    lambda mid: _query_store(mid, vector, k, where), candidates
+                )
+                for hit in store_hits
+            ),
+            key=lambda hit: hit[2]
+        )
+
+    results = []
+    for meeting_id, doc, distance in sorted(hits, key=lambda hit: hit[2])[:k]:
+        meta = doc.metadata or {}
+
+        results.append({
+            "meeting_id": meeting_id,
+            "meeting_name": names.get(meeting_id, meeting_id),
+            "text": doc.page_content,
+            "start": meta.get("start"),
+            "end": meta.get("end"),
+            "ingested_at": meta.get("ingested_at"),
+            "distance": float(distance),
+        })
+
+    return results
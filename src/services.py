@@ -1,17 +1,112 @@
+import os
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
 from src.pipeline import run_pipeline
+from src.workspace import artifact_dir
 from src.embed_store import embed_store
-from src.highlights import extract_highlights
+from src import meeting_store
+from src.highlights import (
+    aextract_highlights,
+    extract_highlights,
+    forget_highlights,
+    stream_highlights,
+)
 from src.chat import ask_question as chat_ask
+from src.chat import stream_answer
+from src.chat import invalidate_meeting as chat_invalidate
+from src.llm_gateway import BACKGROUND, priority
+
+# PRECOMPUTE_NOTES=1 → generate highlights in the background after ingest
+# (off by default: one or more LLM calls per meeting, asked for or not)
+PRECOMPUTE_NOTES = os.getenv("PRECOMPUTE_NOTES", "0") == "1"
+
+# one meeting at a time → a burst of uploads doesn't flood the LLM
+_notes_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="notes")
+
+# rough share of total run time per stage, for job progress
+STAGE_PROGRESS = {
+    "transcribing": 0.05,
+    "chunking": 0.8,
+    "embedding": 0.85,
+}
+
+
+def process_meeting(file_path: str, meeting_id: str, progress=None):
+    """
+    progress(stage, fraction) is optional and is used by the
+    job queue to report where a meeting is in the pipeline.
+    """
+
+    def report(stage):
+        if progress is not None:
+            progress(stage, STAGE_PROGRESS.get(stage))
+
+    meeting_store.update(meeting_id, status="processing")
+
+    try:
+        result = run_pipeline(
+            file_path,
+            artifact_dir=artifact_dir(meeting_id),
+            on_stage=report
+        )
+
+        report("embedding")
+        vectors = embed_store(result.chunks, meeting_id)
+
+    except Exception:
+        meeting_store.update(meeting_id, status="failed")
+        raise
+
+    meeting_store.update(meeting_id, status="done", duration=result.duration)
+    if vectors:
+        meeting_store.add_artifact(meeting_id, "vectors", vectors)
+
+    # cached chains may hold a handle/memory from before a re-ingest
+    chat_invalidate(meeting_id)
+
+    schedule_notes(meeting_id)
+
+
+def _precompute_notes(meeting_id: str):
+    try:
+        # nobody is waiting → chat and /notes go first at the rate limiter
+        with priority(BACKGROUND):
+            extract_highlights(meeting_id)
+    except Exception:
+        traceback.print_exc()
+
+
+def schedule_notes(meeting_id: str):
+    """
+    Post-ingest stage: drop stale notes and, if enabled, build new ones
+    on a background thread so /notes can answer from cache.
+    """
+
+    forget_highlights(meeting_id)
+
+    if PRECOMPUTE_NOTES:
+        _notes_pool.submit(_precompute_notes, meeting_id)
+
+
+def stop_notes():
+    _notes_pool.shutdown(wait=False, cancel_futures=True)
+
+
+# ===============================
+# Request paths (async → awaited by FastAPI, no thread per LLM call)
+# ===============================
+async def generate_notes(meeting_id: str, regenerate: bool = False):
+    return await aextract_highlights(meeting_id, regenerate)
 
 
-def process_meeting(file_path: str, meeting_id: str):
-    chunks_file = run_pipeline(file_path)
-    embed_store(chunks_file, meeting_id)
+async def ask_question(query: str, meeting_id: str, session_id: str):
+    return await chat_ask(query, meeting_id, session_id)
 
 
-def generate_notes(meeting_id: str):   
-    return extract_highlights(meeting_id)
+def stream_notes(meeting_id: str, regenerate: bool = False):
+    return stream_highlights(meeting_id, regenerate)
 
 
-def ask_question(query: str, meeting_id: str):
-    return chat_ask(query, meeting_id)
+def stream_question(query: str, meeting_id: str, session_id: str):
+    return stream_answer(query, meeting_id, session_id)
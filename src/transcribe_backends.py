@@ -0,0 +1,97 @@
+# src/transcribe_backends.py
+
+import os
+
+# TRANSCRIBE_BACKEND=whisper        → openai-whisper / PyTorch (default)
+# TRANSCRIBE_BACKEND=faster-whisper → CTranslate2 engine, int8 weights on CPU
+TRANSCRIBE_BACKEND = os.getenv("TRANSCRIBE_BACKEND", "whisper")
+WHISPER_MODEL = os.getenv("WHISPER_MODEL", "small")
+WHISPER_COMPUTE_TYPE = os.getenv("WHISPER_COMPUTE_TYPE", "int8")
+
+
+class WhisperBackend:
+    """Reference openai-whisper implementation."""
+
+    name = "whisper"
+
+    def __init__(self, model_name=WHISPER_MODEL, threads=None, **_):
+        import whisper
+
+        if threads:
+            import torch
+            torch.set_num_threads(threads)
+
+        self.model_name = model_name
+        self.model = whisper.load_model(model_name)
+
+    def transcribe(self, audio, task="translate"):
+        result = self.model.transcribe(audio, task=task)
+
+        return [
+            {
+                "start": float(seg["start"]),
+                "end": float(seg["end"]),
+                "text": seg["text"].strip()
+            }
+            for seg in result["segments"]
+        ]
+
+
+class FasterWhisperBackend:
+    """
+    faster-whisper (CTranslate2). Much faster on CPU, especially with
+    int8 weights. Optional dependency: pip install faster-whisper
+    """
+
+    name = "faster-whisper"
+
+    def __init__(self, model_name=WHISPER_MODEL, compute_type=WHISPER_COMPUTE_TYPE,
+                 threads=None, **_):
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError:
+            raise RuntimeError(
+                "TRANSCRIBE_BACKEND=faster-whisper needs: pip install faster-whisper"
+            )
+
+        self.model_name = model_name
+        self.model = WhisperModel(
+            model_name,
+            device="cpu",
+            compute_type=compute_type,
+            cpu_threads=threads or 0
+        )
+
+    def transcribe(self, audio, task="translate"):
+        segments, _info = self.model.transcribe(audio, task=task)
+
+        # segments is a lazy generator → this loop does the actual work
+        return [
+            {
+                "start": float(seg.start),
+                "end": float(seg.end),
+                "text": seg.text.strip()
+            }
+            for seg in segments
+        ]
+
+
+BACKENDS = {
+    WhisperBackend.name: WhisperBackend,
+    FasterWhisperBackend.name: FasterWhisperBackend,
+}
+
+
+def load_backend(name=None, model_name=None, compute_type=None, threads=None):
+    name = name or TRANSCRIBE_BACKEND
+
+    if name not in BACKENDS:
+        raise ValueError(
+            f"Unknown TRANSCRIBE_BACKEND: {name} (choose from {', '.join(BACKENDS)})"
+        )
+
+    return BACKENDS[name](
+        model_name=model_name or WHISPER_MODEL,
+        compute_type=compute_type or WHISPER_COMPUTE_TYPE,
+        threads=threads
+    )
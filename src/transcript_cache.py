@@ -0,0 +1,113 @@
+# src/transcript_cache.py
+
+import hashlib
+import json
+import os
+import threading
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CACHE_DIR = os.path.join(BASE_DIR, "data", "cache", "transcripts")
+
+# TRANSCRIPT_CACHE=0 turns the cache off
+ENABLED = os.getenv("TRANSCRIPT_CACHE", "1") != "0"
+MAX_BYTES = int(float(os.getenv("TRANSCRIPT_CACHE_MAX_MB", "200")) * 1024 * 1024)
+
+_lock = threading.Lock()
+
+
+def file_hash(path, block_size=1024 * 1024):
+    """sha256 of the file contents, read in 1 MB blocks."""
+
+    h = hashlib.sha256()
+
+    with open(path, "rb") as f:
+        while block := f.read(block_size):
+            h.update(block)
+
+    return h.hexdigest()
+
+
+def cache_key(media_path, **settings):
+    """
+    Key = audio content + everything that changes the transcript
+    (backend, model, task, audio filters ...).
+    """
+
+    h = hashlib.sha256(file_hash(media_path).encode())
+    h.update(json.dumps(settings, sort_keys=True).encode())
+
+    return h.hexdigest()
+
+
+def _path(key):
+    return os.path.join(CACHE_DIR, f"{key}.json")
+
+
+def get(key):
+    """Cached {"segments": [...], "duration": sec} or None."""
+
+    if not ENABLED:
+        return None
+
+    path = _path(key)
+
+    try:
+        with open(path, encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    # mtime = last use → LRU order for eviction
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+    return entry
+
+
+def put(key, segments, duration):
+
+    if not ENABLED:
+        return
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+
+    path = _path(key)
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"segments": segments, "duration": duration}, f)
+    os.replace(tmp_path, path)
+
+    _evict()
+
+
+def _evict():
+    """Drop least recently used entries until the cache fits MAX_BYTES."""
+
+    with _lock:
+        entries = []
+        total = 0
+
+        for name in os.listdir(CACHE_DIR):
+            if not name.endswith(".json"):
+                continue
+            try:
+                st = os.stat(os.path.join(CACHE_DIR, name))
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, name))
+            total += st.st_size
+
+        entries.sort()
+
+        for _mtime, size, name in entries:
+            if total <= MAX_BYTES:
+                break
+            try:
+                os.remove(os.path.join(CACHE_DIR, name))
+                total -= size
+            except OSError:
+                pass
@@ -0,0 +1,158 @@
+# src/ttl_cache.py
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache where entries also expire ttl seconds
+    after they were last used.
+
+    stats() reports hits / misses / evictions (size limit) and
+    expirations (ttl) so cache sizing can be checked in production.
+    """
+
+    def __init__(self, maxsize=128, ttl=1800, on_evict=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.on_evict = on_evict
+
+        self._data = OrderedDict()     # key → (value, last_used)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, default=None):
+        dropped = []
+
+        with self._lock:
+            entry = self._data.get(key)
+
+            if entry is not None and time.monotonic() - entry[1] > self.ttl:
+                dropped.append((key, self._data.pop(key)[0]))
+                self.expirations += 1
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                value = default
+            else:
+                self.hits += 1
+                self._data[key] = (entry[0], time.monotonic())
+                self._data.move_to_end(key)
+                value = entry[0]
+
+        self._notify(dropped)
+        return value
+
+    def set(self, key, value):
+        dropped = []
+
+        with self._lock:
+            self._data[key] = (value, time.monotonic())
+            self._data.move_to_end(key)
+            dropped = self._trim()
+
+        self._notify(dropped)
+
+    def get_or_create(self, key, factory):
+        """
+        Cached value, or factory() stored under key. The factory runs
+        outside the lock; if two threads race, the first stored wins.
+        """
+
+        missing = object()
+        value = self.get(key, missing)
+        if value is not missing:
+            return value
+
+        value = factory()
+
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                return entry[0]
+
+            self._data[key] = (value, time.monotonic())
+            dropped = self._trim()
+
+        self._notify(dropped)
+        return value
+
+    def items(self):
+        """Snapshot of live (key, value) pairs; does not touch LRU order or stats."""
+
+        now = time.monotonic()
+
+        with self._lock:
+            return [
+                (key, value)
+                for key, (value, last_used) in self._data.items()
+                if now - last_used <= self.ttl
+            ]
+
+    def pop(self, key):
+        with self._lock:
+            entry = self._data.pop(key, None)
+
+        if entry is not None:
+            self._notify([(key, entry[0])])
+
+    def pop_where(self, predicate):
+        """Drop every entry whose key matches predicate(key)."""
+
+        with self._lock:
+            keys = [k for k in self._data if predicate(k)]
+            dropped = [(k, self._data.pop(k)[0]) for k in keys]
+
+        self._notify(dropped)
+
+    def clear(self):
+        with self._lock:
+            dropped = [(k, v[0]) for k, v in self._data.items()]
+            self._data.clear()
+
+        self._notify(dropped)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def _trim(self):
+        """Caller holds the lock. Returns what was dropped."""
+
+        dropped = []
+        now = time.monotonic()
+
+        for key in list(self._data):
+            if now - self._data[key][1] <= self.ttl:
+                break   # ordered by last use → the rest are fresher
+            dropped.append((key, self._data.pop(key)[0]))
+            self.expirations += 1
+
+        while len(self._data) > self.maxsize:
+            key, (value, _) = self._data.popitem(last=False)
+            dropped.append((key, value))
+            self.evictions += 1
+
+        return dropped
+
+    def _notify(self, dropped):
+        if self.on_evict is None:
+            return
+
+        for key, value in dropped:
+            self.on_evict(key, value)
@@ -0,0 +1,111 @@
+# src/vad.py
+
+import numpy as np
+
+FRAME_MS = 30
+
+# how long a pause has to be to count as a good place to cut
+MIN_SILENCE_SECONDS = 0.3
+
+# a frame is speech if it is this many dB above the noise floor
+SPEECH_MARGIN_DB = 12.0
+
+
+def frame_energy_db(audio: np.ndarray, sample_rate: int) -> np.ndarray:
+    """RMS energy per FRAME_MS frame, in dBFS."""
+
+    frame = int(sample_rate * FRAME_MS / 1000)
+    n_frames = len(audio) // frame
+
+    if n_frames == 0:
+        return np.zeros(0, np.float32)
+
+    frames = audio[:n_frames * frame].reshape(n_frames, frame)
+    rms = np.sqrt(np.mean(frames.astype(np.float32) ** 2, axis=1))
+
+    return 20 * np.log10(rms + 1e-10)
+
+
+def _smoothed(energy):
+    """Energy averaged over a pause-length span → low where pauses are."""
+
+    span = max(1, int(MIN_SILENCE_SECONDS * 1000 / FRAME_MS))
+    return np.convolve(energy, np.ones(span) / span, mode="same")
+
+
+def has_speech(audio: np.ndarray, sample_rate: int) -> bool:
+    """
+    Rough check against an absolute level (no noise floor to compare
+    against in a short buffer). Used to skip silent live windows, which
+    Whisper tends to fill with made-up text.
+    """
+
+    energy = frame_energy_db(audio, sample_rate)
+    return bool(len(energy)) and bool((energy > -45.0).any())
+
+
+def last_pause(audio: np.ndarray, sample_rate: int, search_seconds: float) -> int:
+    """
+    Sample index of the quietest point within the last search_seconds,
+    i.e. the best place to cut a growing buffer without splitting a word.
+    """
+
+    frame = int(sample_rate * FRAME_MS / 1000)
+    energy = frame_energy_db(audio, sample_rate)
+
+    if len(energy) < 2:
+        return len(audio)
+
+    smooth = _smoothed(energy)
+    lo = max(1, len(energy) - int(search_seconds * 1000 / FRAME_MS))
+
+    return (lo + int(np.argmin(smooth[lo:]))) * frame
+
+
+def split_on_silence(audio: np.ndarray, sample_rate: int, window_seconds: float):
+    """
+    Cut audio into windows of at most window_seconds, placing every cut
+    in the quietest pause near the end of the window so no word is split.
+
+    Returns a list of (start_sample, end_sample). Windows with no speech
+    at all are dropped.
+    """
+
+    frame = int(sample_rate * FRAME_MS / 1000)
+    energy = frame_energy_db(audio, sample_rate)
+
+    if len(energy) == 0:
+        return [(0, len(audio))] if len(audio) else []
+
+    noise_floor = np.percentile(energy, 10)
+    is_speech = energy > noise_floor + SPEECH_MARGIN_DB
+
+    smooth = _smoothed(energy)
+
+    window = max(1, int(window_seconds * 1000 / FRAME_MS))
+    # look for a cut in the last 30% of each window
+    slack = max(1, int(window * 0.3))
+
+    cuts = []
+    start = 0
+    total = len(energy)
+
+    while start < total:
+        target = start + window
+
+        if target >= total:
+            end = total
+        else:
+            lo = max(start + 1, target - slack)
+            end = lo + int(np.argmin(smooth[lo:target + 1]))
+
+        if is_speech[start:end].any():
+            cuts.append((start * frame, end * frame))
+
+        start = end
+
+    # leftover samples that don't fill a whole frame
+    if cuts and cuts[-1][1] == total * frame:
+        cuts[-1] = (cuts[-1][0], len(audio))
+
+    return cuts
@@ -0,0 +1,258 @@
+# src/vectorstore.py
+
+import os
+import threading
+from contextlib import contextmanager
+
+from chromadb.api.client import SharedSystemClient
+from langchain_chroma import Chroma
+from langchain_core.documents import Document
+
+from src.embed_store import (
+    build_lexical_index,
+    ensure_embedding_model,
+    lexical_path,
+    numpy_backend,
+    shared_mode,
+    store_location,
+    stored_embedding_model,
+)
+from src.embedding_models import EMBEDDING_MODEL, get_embeddings
+from src.hybrid_retriever import HybridRetriever
+from src.lexical_index import BM25Index
+from src.numpy_index import NumpyIndex
+from src.ttl_cache import TTLCache
+
+# open vector-store handles, one per meeting
+STORE_CACHE_SIZE = int(os.getenv("CHAT_STORE_CACHE_SIZE", "32"))
+# idle seconds before a handle is dropped
+STORE_CACHE_TTL = float(os.getenv("CHAT_CACHE_TTL", "1800"))
+
+# HYBRID_RETRIEVAL=0 → vector similarity only
+HYBRID_RETRIEVAL = os.getenv("HYBRID_RETRIEVAL", "1") != "0"
+
+_stores = TTLCache(maxsize=STORE_CACHE_SIZE, ttl=STORE_CACHE_TTL)
+_lexical = TTLCache(maxsize=STORE_CACHE_SIZE, ttl=STORE_CACHE_TTL)
+
+_shared = None
+_shared_lock = threading.Lock()
+
+# chromadb keeps one System (sqlite connection + loaded HNSW segments)
+# per persist directory for the whole process. Handles opened here are
+# counted → persist_directory: [open handles, System started by us]
+_systems = {}
+_systems_lock = threading.Lock()
+
+
+def _open(meeting_id: str):
+    persist_directory, collection_name = store_location(meeting_id)
+
+    with _systems_lock:
+        entry = _systems.setdefault(persist_directory, [
+            0, persist_directory not in SharedSystemClient._identifier_to_system
+        ])
+        entry[0] += 1
+
+    return Chroma(
+        persist_directory=persist_directory,
+        embedding_function=get_embeddings(),
+        collection_name=collection_name
+    )
+
+
+def get_shared_store(meeting_id: str = None):
+    """The one handle on the shared collection, opened on first use."""
+
+    global _shared
+
+    with _shared_lock:
+        if _shared is None:
+            ensure_embedding_model(meeting_id)
+            _shared = _open(meeting_id)
+
+        return _shared
+
+
+def get_store(meeting_id: str):
+    """
+    Vector-store handle (Chroma or NumpyIndex) for ONE meeting, shared by chat and highlights,
+    opened once and reused until it goes idle.
+
+    The meeting's stored embedding model is checked against the query
+    model first (see embed_store.ensure_embedding_model). In shared
+    mode every meeting maps to the same handle; use search_kwargs()
+    to restrict queries to one meeting.
+    """
+
+    def open_store():
+        if shared_mode():
+            db = get_shared_store(meeting_id)
+
+            if not db.get(where={"meeting_id": meeting_id}, limit=1)["ids"]:
+                raise ValueError(f"Meeting not found: {meeting_id}")
+
+            return db
+
+        if not os.path.exists(store_location(meeting_id)[0]):
+            raise ValueError(f"Meeting not found: {meeting_id}")
+
+        ensure_embedding_model(meeting_id)
+
+        if numpy_backend():
+            return NumpyIndex(store_location(meeting_id)[0], get_embeddings())
+
+        return _open(meeting_id)
+
+    return _stores.get_or_create(meeting_id, open_store)
+
+
+def _close(meeting_id: str):
+    """
+    Give back a handle from _open(). The last one on a directory stops
+    its System, unless something else (ingest, an earlier open) had
+    already started it.
+    """
+
+    persist_directory = store_location(meeting_id)[0]
+
+    with _systems_lock:
+        entry = _systems.get(persist_directory)
+        if entry is None:
+            return
+
+        entry[0] -= 1
+        if entry[0] > 0:
+            return
+
+        del _systems[persist_directory]
+        if not entry[1]:
+            return
+
+        system = SharedSystemClient._identifier_to_system.pop(persist_directory, None)
+
+    if system is not None:
+        system.stop()
+
+
+@contextmanager
+def search_handle(meeting_id: str):
+    """
+    Handle on ONE meeting for the duration of a cross-meeting search.
+
+    Reuses the chat handle if one is open; otherwise opens one outside
+    the chat cache (a search touches every meeting and would push out
+    the handles chat is using) and releases it, Chroma System included,
+    when the block ends. Never re-embeds: yields None when the meeting's
+    vectors come from another model.
+    """
+
+    for key, db in _stores.items():
+        if key == meeting_id:
+            yield db
+            return
+
+    persist_directory = store_location(meeting_id)[0]
+
+    if numpy_backend():
+        db = NumpyIndex(persist_directory, get_embeddings())
+        yield _if_current(meeting_id, db, db.embedding_model)
+        return
+
+    db = _open(meeting_id)
+    try:
+        yield _if_current(meeting_id, db, stored_embedding_model(db._collection))
+    finally:
+        _close(meeting_id)
+
+
+def _if_current(meeting_id, db, stored):
+    if stored != EMBEDDING_MODEL:
+        print(f"⚠️ Search skips {meeting_id}: embedded with {stored}")
+        return None
+
+    return db
+
+
+def get_lexical(meeting_id: str) -> BM25Index:
+    """BM25 index of ONE meeting; built from the stored chunks if missing."""
+
+    def open_index():
+        path = lexical_path(meeting_id)
+
+        if not os.path.exists(path):
+            print(f"🔧 Building keyword index for {meeting_id}")
+            build_lexical_index(meeting_id)
+
+        return BM25Index(path)
+
+    return _lexical.get_or_create(meeting_id, open_index)
+
+
+def search_kwargs(meeting_id: str, k: int) -> dict:
+    kwargs = {"k": k}
+
+    if shared_mode():
+        kwargs["filter"] = {"meeting_id": meeting_id}
+
+    return kwargs
+
+
+def get_retriever(meeting_id: str, k: int):
+    """
+    Retriever over ONE meeting's chunks, whatever the storage mode.
+    Vector + BM25 fused (src/hybrid_retriever.py) unless HYBRID_RETRIEVAL=0.
+    """
+
+    store = get_store(meeting_id)
+    kwargs = search_kwargs(meeting_id, k)
+
+    if not HYBRID_RETRIEVAL:
+        return store.as_retriever(search_kwargs=kwargs)
+
+    return HybridRetriever(
+        store=store,
+        lexical=get_lexical(meeting_id),
+        k=k,
+        filter=kwargs.get("filter")
+    )
+
+
+def search_many(meeting_id: str, vectors, k: int):
+    """
+    Top-k chunks of ONE meeting for several query vectors in a single
+    call: one batched chroma query, or one matrix product for NumpyIndex.
+    """
+
+    store = get_store(meeting_id)
+    where = search_kwargs(meeting_id, k).get("filter")
+
+    if isinstance(store, NumpyIndex):
+        return store.similarity_search_by_vectors(vectors, k=k, filter=where)
+
+    result = store._collection.query(
+        query_embeddings=[list(map(float, v)) for v in vectors],
+        n_results=k,
+        where=where,
+        include=["documents", "metadatas"]
+    )
+
+    return [
+        [
+            Document(page_content=doc, metadata=meta or {})
+            for doc, meta in zip(docs, metas)
+        ]
+        for docs, metas in zip(result["documents"], result["metadatas"])
+    ]
+
+
+def invalidate(meeting_id: str):
+    _stores.pop(meeting_id)
+    _lexical.pop(meeting_id)
+
+
+def cache_stats():
+    return _stores.stats()
+
+
+def lexical_stats():
+    return _lexical.stats()
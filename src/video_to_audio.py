@@ -1,12 +1,44 @@
 import subprocess
+import threading
+import queue
 import os
 
+import numpy as np
+
+from src.vad import last_pause
+
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
+SAMPLE_RATE = 16000
+
+# LOUDNORM=single → one-pass loudnorm (default, same as before)
+# LOUDNORM=off    → skip loudness normalisation (faster)
+LOUDNORM = os.getenv("LOUDNORM", "single")
+
+# length of one window in streaming mode
+WINDOW_SECONDS = float(os.getenv("STREAM_WINDOW_SECONDS", "30"))
+
+# ~10 s of s16le mono per pipe read
+READ_BYTES = SAMPLE_RATE * 2 * 10
+
+
+def audio_filters(loudnorm=None):
+    loudnorm = LOUDNORM if loudnorm is None else loudnorm
+
+    if loudnorm not in ("single", "off"):
+        raise ValueError(f"Unknown LOUDNORM mode: {loudnorm}")
 
-def video_to_audio(video_path):
+    filters = ["afftdn"]
+    if loudnorm == "single":
+        filters.insert(0, "loudnorm")
 
-    output_folder = os.path.join(BASE_DIR, "data", "intermediate")
+    return ",".join(filters)
+
+
+def video_to_audio(video_path, output_folder=None, loudnorm=None):
+
+    if output_folder is None:
+        output_folder = os.path.join(BASE_DIR, "data", "intermediate")
     clean_audio_name = "clean_meeting_audio.wav"
 
     os.makedirs(output_folder, exist_ok=True)
@@ -17,12 +49,201 @@ def video_to_audio(video_path):
         "ffmpeg",
         "-y",
         "-i", video_path,
-        "-ar", "16000",
+        "-ar", str(SAMPLE_RATE),
         "-ac", "1",
-        "-af", "loudnorm,afftdn",
+        "-af", audio_filters(loudnorm),
         output_path
     ]
 
     subprocess.run(command, check=True)
 
     return output_path
+
+
+# ===============================
+# Raw PCM straight from ffmpeg
+# ===============================
+def _open_pcm(media_path, loudnorm):
+    command = [
+        "ffmpeg",
+        "-nostdin",
+        "-loglevel", "error",
+        "-i", media_path,
+        "-ar", str(SAMPLE_RATE),
+        "-ac", "1",
+        "-af", audio_filters(loudnorm),
+        "-f", "s16le",
+        "-acodec", "pcm_s16le",
+        "-"
+    ]
+
+    return subprocess.Popen(
+        command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE
+    )
+
+
+def _close_pcm(proc, check=True):
+    proc.stdout.close()
+    stderr = proc.stderr.read()
+    proc.stderr.close()
+    code = proc.wait()
+
+    if check and code != 0:
+        raise subprocess.CalledProcessError(code, proc.args, stderr=stderr)
+
+
+def _read_samples(proc, nbytes):
+    """Up to nbytes of PCM as int16 (empty at end of stream)."""
+
+    block = proc.stdout.read(nbytes)
+    if len(block) % 2:
+        block = block[:-1]
+
+    return np.frombuffer(block, np.int16)
+
+
+def probe_duration(media_path):
+    """Duration in seconds from ffprobe, or None if it can't tell."""
+
+    try:
+        out = subprocess.run(
+            [
+                "ffprobe", "-v", "error",
+                "-show_entries", "format=duration",
+                "-of", "csv=p=0",
+                media_path
+            ],
+            check=True,
+            capture_output=True,
+            text=True
+        ).stdout.strip()
+        return float(out)
+    except (subprocess.CalledProcessError, ValueError, OSError):
+        return None
+
+
+def decode_audio(media_path, loudnorm=None) -> np.ndarray:
+    """
+    Decode to a mono 16 kHz float32 array (what Whisper wants)
+    without an intermediate WAV on disk.
+
+    The buffer is sized from ffprobe's duration up front and filled
+    as ffmpeg streams PCM, so we never hold the raw bytes and the
+    float copy at the same time.
+    """
+
+    duration = probe_duration(media_path) or 60.0
+    capacity = int(duration * SAMPLE_RATE) + SAMPLE_RATE
+
+    audio = np.empty(capacity, np.float32)
+    n = 0
+
+    proc = _open_pcm(media_path, loudnorm)
+    ok = False
+
+    try:
+        while True:
+            samples = _read_samples(proc, READ_BYTES)
+            if len(samples) == 0:
+                break
+
+            if n + len(samples) > capacity:
+                capacity = max(capacity * 2, n + len(samples))
+                grown = np.empty(capacity, np.float32)
+                grown[:n] = audio[:n]
+                audio = grown
+
+            audio[n:n + len(samples)] = samples
+            n += len(samples)
+
+        ok = True
+
+    finally:
+        _close_pcm(proc, check=ok)
+
+    audio = audio[:n]
+    audio *= 1.0 / 32768.0
+
+    return audio
+
+
+def iter_audio_windows(media_path, window_seconds=None, loudnorm=None, max_pending=2):
+    """
+    Yields (offset_seconds, window) pairs of float32 audio while ffmpeg
+    is still decoding.
+
+    Each window is cut at the quietest pause in its last 30% (src/vad.py)
+    and the rest is carried into the next one, so no word is split
+    between two Whisper calls.
+
+    A reader thread fills a bounded queue of at most max_pending windows,
+    so memory stays at a few windows no matter how long the input is,
+    and decoding overlaps with whatever the consumer does.
+    """
+
+    window_seconds = WINDOW_SECONDS if window_seconds is None else window_seconds
+    window_samples = int(window_seconds * SAMPLE_RATE)
+
+    windows = queue.Queue(maxsize=max(1, max_pending))
+    stop = threading.Event()
+    done = object()
+
+    proc = _open_pcm(media_path, loudnorm)
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                windows.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def reader():
+        offset = 0
+        carry = np.zeros(0, np.float32)
+        try:
+            while not stop.is_set():
+                # top up to a full window after the carried-over audio
+                wanted = max(1, window_samples - len(carry))
+                samples = _read_samples(proc, wanted * 2)
+                last = len(samples) < wanted
+
+                audio = np.concatenate([carry, samples.astype(np.float32) / 32768.0])
+
+                if last:
+                    if len(audio):
+                        put((offset / SAMPLE_RATE, audio))
+                    break
+
+                cut = last_pause(audio, SAMPLE_RATE, search_seconds=window_seconds * 0.3)
+                carry = audio[cut:]
+
+                put((offset / SAMPLE_RATE, audio[:cut]))
+                offset += cut
+
+            _close_pcm(proc, check=not stop.is_set())
+            put(done)
+
+        except Exception as e:
+            put(e)
+
+    thread = threading.Thread(target=reader, daemon=True)
+    thread.start()
+
+    try:
+        while True:
+            item = windows.get()
+            if item is done:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    finally:
+        # consumer stopped early (or failed) → stop ffmpeg
+        stop.set()
+        if proc.poll() is None:
+            proc.kill()
+        thread.join(timeout=5)
@@ -0,0 +1,46 @@
+# src/workspace.py
+
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+INTERMEDIATE_DIR = os.path.join(BASE_DIR, "data", "intermediate")
+
+# set KEEP_INTERMEDIATE=1 to keep scratch files / write debug artifacts
+KEEP_INTERMEDIATE = os.getenv("KEEP_INTERMEDIATE", "0") == "1"
+
+
+@contextmanager
+def meeting_workspace(meeting_id: str):
+    """
+    Private scratch directory for ONE pipeline run.
+
+    Every run gets a fresh directory (even for the same meeting_id),
+    so parallel runs never share intermediate files.
+    Removed when the run ends, success or not.
+    """
+
+    os.makedirs(INTERMEDIATE_DIR, exist_ok=True)
+
+    workdir = tempfile.mkdtemp(prefix=f"{meeting_id}_", dir=INTERMEDIATE_DIR)
+
+    try:
+        yield workdir
+    finally:
+        if not KEEP_INTERMEDIATE:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+def artifact_dir(meeting_id: str):
+    """
+    Where the pipeline should dump transcript/chunks for a meeting,
+    or None when KEEP_INTERMEDIATE is off (the normal case).
+    """
+
+    if not KEEP_INTERMEDIATE:
+        return None
+
+    return os.path.join(INTERMEDIATE_DIR, meeting_id)
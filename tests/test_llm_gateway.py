@@ -0,0 +1,221 @@
+# tests/test_llm_gateway.py
+
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+
+from src import llm_gateway
+from src.llm_gateway import (
+    BACKGROUND,
+    INTERACTIVE,
+    GatewayChatModel,
+    LLMGateway,
+    TokenBucket,
+)
+
+MESSAGES = [{"role": "user", "content": "hello"}]
+
+
+def completion(text="hi"):
+    return {
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": text}}],
+        "usage": {"prompt_tokens": 3, "completion_tokens": 1},
+    }
+
+
+def sse(*pieces):
+    for piece in pieces:
+        yield f"data: {json.dumps({'choices': [{'delta': {'content': piece}}]})}\n\n".encode()
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(llm_gateway, "LLM_BACKOFF", 0.01)
+
+
+@pytest.fixture
+def gateway():
+    """gateway(handler) → LLMGateway whose requests go to handler(request)."""
+
+    made = []
+    requests = []
+
+    def make(handler):
+        def record(request):
+            requests.append(request)
+            return handler(request)
+
+        gw = LLMGateway(
+            base_url="http://llm.test/v1", api_key="test",
+            transport=httpx.MockTransport(record)
+        )
+        gw.requests = requests
+        made.append(gw)
+        return gw
+
+    yield make
+
+    for gw in made:
+        gw.close()
+
+
+def test_missing_api_key_is_a_clear_error():
+    with pytest.raises(RuntimeError, match="LLM_API_KEY"):
+        LLMGateway(api_key="")
+
+
+def test_retries_429_after_retry_after(gateway):
+    replies = iter([
+        httpx.Response(429, headers={"retry-after": "0.3"}, json={"error": "slow down"}),
+        httpx.Response(200, json=completion("done")),
+    ])
+    gw = gateway(lambda request: next(replies))
+
+    start = time.monotonic()
+    result = gw.complete_sync(MESSAGES)
+
+    assert result["content"] == "done"
+    assert time.monotonic() - start >= 0.3
+    assert len(gw.requests) == 2
+    assert gw.stats()["retries"] == 1
+
+
+def test_identical_requests_in_flight_are_coalesced(gateway):
+    release = threading.Event()
+
+    async def slow(request):
+        await asyncio.get_running_loop().run_in_executor(None, release.wait, 5)
+        return httpx.Response(200, json=completion("shared"))
+
+    gw = gateway(slow)
+
+    with ThreadPoolExecutor(5) as pool:
+        futures = [pool.submit(gw.complete_sync, MESSAGES) for _ in range(5)]
+
+        deadline = time.monotonic() + 5
+        while gw.stats()["coalesced"] < 4 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        release.set()
+
+        results = [f.result(timeout=5) for f in futures]
+
+    assert [r["content"] for r in results] == ["shared"] * 5
+    assert len(gw.requests) == 1
+    assert gw.stats()["coalesced"] == 4
+
+
+def test_stream_is_not_retried_after_first_token(gateway):
+    async def broken():
+        for chunk in sse("Hel"):
+            yield chunk
+        raise httpx.ReadError("connection lost")
+
+    gw = gateway(lambda request: httpx.Response(200, content=broken()))
+
+    pieces = []
+    with pytest.raises(httpx.ReadError):
+        for piece in gw.stream_sync(MESSAGES):
+            pieces.append(piece)
+
+    assert pieces == ["Hel"]
+    assert len(gw.requests) == 1
+
+
+def test_stream_is_retried_before_first_token(gateway):
+    replies = iter([
+        httpx.Response(503),
+        httpx.Response(200, content=b"".join(sse("Hel", "lo")) + b"data: [DONE]\n\n"),
+    ])
+    gw = gateway(lambda request: next(replies))
+
+    assert "".join(gw.stream_sync(MESSAGES)) == "Hello"
+    assert len(gw.requests) == 2
+
+
+def test_interactive_calls_go_first():
+    async def scenario():
+        bucket = TokenBucket(rate=0, burst=1)
+        bucket.pause(0.1)
+
+        order = []
+
+        async def call(name, level):
+            await bucket.acquire(level)
+            order.append(name)
+
+        await asyncio.gather(
+            call("precompute 1", BACKGROUND),
+            call("precompute 2", BACKGROUND),
+            call("chat", INTERACTIVE),
+        )
+        return order
+
+    assert asyncio.run(scenario()) == ["chat", "precompute 1", "precompute 2"]
+
+
+def test_no_limit_by_default():
+    async def scenario():
+        bucket = TokenBucket(rate=0, burst=1)
+        start = time.monotonic()
+        for _ in range(100):
+            await bucket.acquire()
+        return time.monotonic() - start
+
+    assert asyncio.run(scenario()) < 0.1
+
+
+def test_rate_limit_spaces_calls_after_the_burst():
+    async def scenario():
+        bucket = TokenBucket(rate=20, burst=2)
+        times = []
+        for _ in range(5):
+            await bucket.acquire()
+            times.append(time.monotonic())
+        return [b - a for a, b in zip(times, times[1:])]
+
+    gaps = asyncio.run(scenario())
+
+    # burst of 2 goes straight through, then one call per 1/20 s
+    assert gaps[0] < 0.02
+    assert all(0.04 <= gap < 0.1 for gap in gaps[1:])
+
+
+def test_gateway_applies_the_rate_limit(gateway, monkeypatch):
+    sent = []
+
+    def handler(request):
+        sent.append(time.monotonic())
+        return httpx.Response(200, json=completion())
+
+    gw = gateway(handler)
+    gw._bucket = TokenBucket(rate=10, burst=1)
+
+    for i in range(4):
+        gw.complete_sync([{"role": "user", "content": f"question {i}"}])
+
+    gaps = [b - a for a, b in zip(sent, sent[1:])]
+    assert all(gap >= 0.08 for gap in gaps)
+
+
+def test_chat_model_async_path_uses_the_gateway(gateway, monkeypatch):
+    def handler(request):
+        if json.loads(request.content).get("stream"):
+            return httpx.Response(200, content=b"".join(sse("a", "b")) + b"data: [DONE]\n\n")
+        return httpx.Response(200, json=completion("whole"))
+
+    gw = gateway(handler)
+    monkeypatch.setattr(llm_gateway, "_gateway", gw)
+
+    async def scenario():
+        model = GatewayChatModel()
+        answer = await model.ainvoke("hello")
+        pieces = [chunk.content async for chunk in model.astream("hello") if chunk.content]
+        return answer.content, pieces
+
+    assert asyncio.run(scenario()) == ("whole", ["a", "b"])
+    assert len(gw.requests) == 2